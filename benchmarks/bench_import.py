@@ -0,0 +1,80 @@
+"""Import-time benchmark for the montecarlo package.
+
+Times a fresh interpreter importing montecarlo.simulator and then rolling dice and playing a game,
+against a bare interpreter importing NumPy only, and checks that pandas is not imported along the way.
+Exits with status 1 if pandas was imported or the import took longer than --max-ms.
+
+    python benchmarks/bench_import.py
+    python benchmarks/bench_import.py --repeat 20 --max-ms 150
+"""
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Each snippet prints the seconds its timed part took and whether pandas got imported
+SNIPPETS = {
+    'numpy': """
+import time
+start = time.perf_counter()
+import numpy
+seconds = time.perf_counter() - start
+""",
+    'import': """
+import time
+import numpy
+start = time.perf_counter()
+import montecarlo.simulator
+seconds = time.perf_counter() - start
+""",
+    'import_and_play': """
+import time
+import numpy
+start = time.perf_counter()
+import montecarlo.simulator as s
+die = s.Die(numpy.array(list('ABCDEF')))
+die.roll_die(1000)
+s.Game([die, die, die]).play(1000)
+seconds = time.perf_counter() - start
+""",
+}
+
+REPORT = """
+import sys, json
+print(json.dumps({'seconds': seconds, 'pandas': 'pandas' in sys.modules}))
+"""
+
+
+def measure(snippet, repeat):
+    """Return the best time of repeat fresh interpreters running snippet and whether any imported pandas."""
+    best, pandas = float('inf'), False
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', snippet + REPORT], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout
+        result = json.loads(output)
+        best, pandas = min(best, result['seconds']), pandas or result['pandas']
+    return best, pandas
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=10, help='fresh interpreters per measurement')
+    parser.add_argument('--max-ms', type=float, help='fail if importing montecarlo.simulator takes longer')
+    args = parser.parse_args(argv)
+
+    failed = False
+    for name, snippet in SNIPPETS.items():
+        seconds, pandas = measure(snippet, args.repeat)
+        print(f"{name:16s} {seconds * 1e3:8.1f} ms   pandas imported: {pandas}")
+        if name != 'numpy' and pandas:
+            failed = True
+        if name == 'import' and args.max_ms is not None and seconds * 1e3 > args.max_ms:
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,204 @@
+"""Benchmarks for the Die, Game and Analyzer hot paths.
+
+Times Die.roll_die, Game.play, both show_outcome views and the Analyzer methods over a sweep
+of faces, dice and rolls, recording the best wall time and the peak traced memory of each.
+Results are saved as JSON so two runs (for example before and after a change) can be compared.
+
+    python benchmarks/bench_simulator.py run --label before
+    python benchmarks/bench_simulator.py run --label after
+    python benchmarks/bench_simulator.py compare benchmarks/results/before.json benchmarks/results/after.json
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import itertools
+import subprocess
+import tracemalloc
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from montecarlo.simulator import Die, Game, Analyzer
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+LETTERS = np.array(list('ABCDEFGHIJKLMNOPQRSTUVWXYZ'))
+# Sizes swept by default and with --quick
+SIZES = {'faces': [2, 6, 26], 'dice': [1, 5, 10], 'rolls': [10**3, 10**5, 10**7]}
+QUICK_SIZES = {'faces': [2, 26], 'dice': [1, 5], 'rolls': [10**3, 10**5]}
+
+
+def make_game(num_faces, num_dice):
+    """Return a game of num_dice dice with num_faces letter faces, the first face of each weighted up."""
+    dice = []
+    for _ in range(num_dice):
+        die = Die(LETTERS[:num_faces])
+        die.change_weight('A', 3)
+        dice.append(die)
+    return Game(dice)
+
+
+def bench_roll_die(game, num_rolls):
+    """Die.roll_die as a NumPy array."""
+    die = game.dice[0]
+    return lambda: die.roll_die(num_rolls, as_array=True)
+
+
+def bench_play(game, num_rolls):
+    """Game.play with a fixed seed."""
+    return lambda: game.play(num_rolls, seed=0)
+
+
+def bench_show_wide(game, num_rolls):
+    """Game.show_outcome("wide"), rebuilding the DataFrame every time."""
+    game.play(num_rolls, seed=0)
+
+    def run():
+        game._outcome = None
+        return game.show_outcome("wide")
+    return run
+
+
+def bench_show_narrow(game, num_rolls):
+    """Game.show_outcome("narrow")."""
+    game.play(num_rolls, seed=0)
+    return lambda: game.show_outcome("narrow")
+
+
+def analyzer_bench(method):
+    """Make a benchmark of an Analyzer method, with a new analyzer (and so an empty cache) every run."""
+    def setup(game, num_rolls):
+        game.play(num_rolls, seed=0)
+        return lambda: getattr(Analyzer(game), method)()
+    setup.__doc__ = f"Analyzer.{method} on a fresh analyzer."
+    return setup
+
+
+BENCHMARKS = {
+    'roll_die': bench_roll_die,
+    'play': bench_play,
+    'show_outcome_wide': bench_show_wide,
+    'show_outcome_narrow': bench_show_narrow,
+    'jackpot': analyzer_bench('jackpot'),
+    'face_counts_per_roll': analyzer_bench('face_counts_per_roll'),
+    'combo_count': analyzer_bench('combo_count'),
+    'permutation_count': analyzer_bench('permutation_count'),
+}
+
+
+def measure(func, repeat):
+    """Return the best wall time of repeat calls of func and the peak memory traced during them."""
+    times = []
+    tracemalloc.start()
+    try:
+        for _ in range(repeat):
+            tracemalloc.reset_peak()
+            start = time.perf_counter()
+            func()
+            times.append(time.perf_counter() - start)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return min(times), peak
+
+
+def run(args):
+    """Run the sweep and save the results."""
+    records = []
+    names = args.bench or list(BENCHMARKS)
+    for num_faces, num_dice, num_rolls in itertools.product(args.faces, args.dice, args.rolls):
+        if num_rolls * num_dice * max(num_faces, 8) > args.max_cells:
+            print(f"skipping faces={num_faces} dice={num_dice} rolls={num_rolls}: over --max-cells")
+            continue
+        game = make_game(num_faces, num_dice)
+        for name in names:
+            func = BENCHMARKS[name](game, num_rolls)
+            repeat = args.repeat if num_rolls <= 10**5 else 1
+            seconds, peak = measure(func, repeat)
+            records.append({'bench': name, 'faces': num_faces, 'dice': num_dice, 'rolls': num_rolls,
+                            'seconds': seconds, 'peak_bytes': peak})
+            print(f"{name:22s} faces={num_faces:<3d} dice={num_dice:<3d} rolls={num_rolls:<9d} "
+                  f"{seconds * 1e3:10.2f} ms {peak / 2**20:9.1f} MiB")
+
+    label = args.label or git_revision() or 'local'
+    result = {'label': label, 'revision': git_revision(), 'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+              'python': platform.python_version(), 'numpy': np.__version__, 'pandas': pd.__version__,
+              'machine': platform.machine(), 'records': records}
+    path = args.output or os.path.join(RESULTS_DIR, f'{label}.json')
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(result, f, indent=1)
+    print(f"saved {len(records)} results to {path}")
+
+
+def compare(args):
+    """Print the time and memory ratios of matching records in two result files."""
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+    key = lambda record: (record['bench'], record['faces'], record['dice'], record['rolls'])
+    base_records = {key(record): record for record in base['records']}
+    regressions = 0
+    print(f"{base['label']} -> {new['label']}")
+    for record in new['records']:
+        old = base_records.get(key(record))
+        if old is None:
+            continue
+        time_ratio = record['seconds'] / old['seconds']
+        memory_ratio = (record['peak_bytes'] + 1) / (old['peak_bytes'] + 1)
+        flag = ''
+        if time_ratio > args.threshold or memory_ratio > args.threshold:
+            flag = 'REGRESSION'
+            regressions += 1
+        print(f"{record['bench']:22s} faces={record['faces']:<3d} dice={record['dice']:<3d} "
+              f"rolls={record['rolls']:<9d} time x{time_ratio:6.2f} memory x{memory_ratio:6.2f} {flag}")
+    return 1 if regressions else 0
+
+
+def git_revision():
+    """Return the short git revision of the working tree, if there is one."""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='run the benchmark sweep')
+    run_parser.add_argument('--faces', type=int, nargs='+', help='numbers of faces, default 2 6 26')
+    run_parser.add_argument('--dice', type=int, nargs='+', help='numbers of dice, default 1 5 10')
+    run_parser.add_argument('--rolls', type=int, nargs='+', help='numbers of rolls, default 10^3 10^5 10^7')
+    run_parser.add_argument('--bench', nargs='+', choices=list(BENCHMARKS), help='only run these benchmarks')
+    run_parser.add_argument('--repeat', type=int, default=3, help='runs per benchmark up to 10^5 rolls')
+    run_parser.add_argument('--max-cells', type=int, default=4 * 10**9,
+                            help='skip configurations where rolls * dice * faces is larger than this')
+    run_parser.add_argument('--label', help='name of the result file, defaults to the git revision')
+    run_parser.add_argument('--output', help='path of the result file')
+    run_parser.add_argument('--quick', action='store_true', help='small sweep for a fast check, for the sizes not given')
+
+    compare_parser = commands.add_parser('compare', help='compare two result files')
+    compare_parser.add_argument('base')
+    compare_parser.add_argument('new')
+    compare_parser.add_argument('--threshold', type=float, default=1.2,
+                                help='ratio above which a time or memory change counts as a regression')
+
+    args = parser.parse_args(argv)
+    if args.command == 'compare':
+        return compare(args)
+    # --quick only shrinks the sweep along the sizes not given on the command line
+    for name, value in (QUICK_SIZES if args.quick else SIZES).items():
+        if getattr(args, name) is None:
+            setattr(args, name, value)
+    run(args)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
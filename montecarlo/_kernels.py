@@ -0,0 +1,150 @@
+"""NumPy kernels shared by every analyzer in the package: alias-table sampling, packing rows of
+face codes into keys, counting distinct rows and the other per-roll reductions.
+They work on plain arrays of codes and never import pandas.
+"""
+import hashlib
+import numpy as np
+
+#Sampling tables shared by every die with the same weights, keyed by a hash of the weights
+_tables = dict()
+_MAX_TABLES = 1024
+
+class SamplingTable:
+    """An immutable alias table (Vose's method) for drawing face positions in proportion to weights.
+    One table is shared by every die with the same weights, across all games in the process.
+    """
+    __slots__ = ('probs', 'threshold', 'alias')
+
+    def __init__(self, weights):
+        if (weights < 0).any() or not np.isfinite(weights).all():
+            raise ValueError("weights must be finite and non-negative")
+        total = weights.sum()
+        if total <= 0:
+            raise ValueError("weights must not all be zero")
+        probs = weights / total
+
+        # Pair each under-full slot with an over-full face that tops it up to one
+        scaled = probs * probs.size
+        threshold = np.ones(probs.size)
+        alias = np.arange(probs.size, dtype=np.int32)
+        small = [i for i in range(probs.size) if scaled[i] < 1.0]
+        large = [i for i in range(probs.size) if scaled[i] >= 1.0]
+        while small and large:
+            under, over = small.pop(), large.pop()
+            threshold[under], alias[under] = scaled[under], over
+            scaled[over] += scaled[under] - 1.0
+            (small if scaled[over] < 1.0 else large).append(over)
+
+        for array in (probs, threshold, alias):
+            array.flags.writeable = False
+        self.probs, self.threshold, self.alias = probs, threshold, alias
+
+def sampling_table(weights):
+    """Return the shared SamplingTable for weights, building it on a miss and evicting the least recently used.
+    The dict keeps insertion order, so a hit is moved to the end by reinserting it.
+    Weights are keyed after normalizing, so proportional weights share a table too.
+    """
+    weights = np.ascontiguousarray(weights, dtype=float)
+    total = weights.sum()
+    if np.isfinite(total) and total > 0:
+        weights = weights / total
+    key = hashlib.blake2b(weights.tobytes(), digest_size=16).digest()
+    table = _tables.pop(key, None)
+    if table is None:
+        table = SamplingTable(weights)
+        if len(_tables) >= _MAX_TABLES:
+            del _tables[next(iter(_tables))]
+    _tables[key] = table
+    return table
+
+def sample(tables, draws, which=None):
+    """Turn a matrix of uniform draws into face positions with alias tables, one uniform per roll.
+    The whole part of draw * faces picks a slot and the fractional part decides between the
+    slot's face and its alias.  Column j uses tables[which[j]] (tables[0] when which is None).
+    """
+    num_faces = tables[0].probs.size
+    scaled = draws * num_faces
+    slots = scaled.astype(np.int32)
+    np.minimum(slots, num_faces - 1, out=slots)
+    scaled -= slots
+    if len(tables) == 1:
+        flat, threshold, alias = slots, tables[0].threshold, tables[0].alias
+    else:
+        # Offset each column's slots into its own table once the tables are laid end to end
+        flat = slots + (which * num_faces).astype(np.int32)
+        threshold = np.concatenate([table.threshold for table in tables])
+        alias = np.concatenate([table.alias for table in tables])
+    result = alias.take(flat)
+    np.copyto(result, slots, where=scaled < threshold.take(flat))
+    return result
+
+def jackpot_mask(codes):
+    """Return a boolean array flagging the rows of codes where every column matches the first."""
+    return (codes == codes[:, :1]).all(axis=1)
+
+def face_counts(codes, num_faces):
+    """Return a (rows, num_faces) matrix of how many times each face code appears in each row of codes,
+    in the smallest integer dtype that holds the number of columns.
+    """
+    # Each column adds one to its face in every row; a single column never hits a cell twice,
+    # so a plain scatter-add into the small integer matrix works without bincount's int64 table
+    num_rolls, num_dice = codes.shape
+    counts = np.zeros((num_rolls, num_faces), dtype=np.min_scalar_type(-num_dice))
+    rows = np.arange(num_rolls)
+    for j in range(num_dice):
+        counts[rows, codes[:, j]] += 1
+    return counts
+
+def pack_rows(codes, num_faces):
+    """Pack each row of codes into a single key.
+    Rows are read as base num_faces numbers in a uint64 when they fit, otherwise the raw bytes
+    of each row are viewed as one void scalar.
+    """
+    if num_faces ** codes.shape[1] <= 2 ** 64:
+        keys = np.zeros(codes.shape[0], dtype=np.uint64)
+        for j in range(codes.shape[1]):
+            keys = keys * np.uint64(num_faces) + codes[:, j]
+        return keys
+    rows = np.ascontiguousarray(codes)
+    return rows.view(np.dtype((np.void, rows.dtype.itemsize * rows.shape[1]))).ravel()
+
+def unpack_rows(keys, num_faces, num_dice, dtype):
+    """Turn keys made by pack_rows back into a matrix of codes with num_dice columns."""
+    if keys.dtype != np.uint64:
+        return np.frombuffer(keys.tobytes(), dtype=dtype).reshape(-1, num_dice)
+    rows = np.empty((keys.size, num_dice), dtype=dtype)
+    for j in range(num_dice - 1, -1, -1):
+        keys, rows[:, j] = np.divmod(keys, np.uint64(num_faces))
+    return rows
+
+def row_order(keys, rows):
+    """Return the order putting distinct keys and their unpacked rows in face order, or None when
+    they already are.  uint64 keys sort in face order; the bytes of void keys don't.
+    """
+    if keys.dtype == np.uint64:
+        return None
+    return np.lexsort(rows.T[::-1])
+
+def count_rows(codes, num_faces, combinations=False):
+    """Return the distinct packed keys of the rows of codes and how many times each appears.
+    Set combinations to True to sort each row first, so the order of the columns doesn't matter.
+    """
+    if combinations:
+        codes = np.sort(codes, axis=1)
+    return np.unique(pack_rows(codes, num_faces), return_counts=True)
+
+def merge_counts(keys, counts, new_keys, new_counts):
+    """Merge two sets of distinct keys and their counts into one."""
+    if keys is None:
+        return new_keys, new_counts.astype(np.int64)
+    merged, inverse = np.unique(np.concatenate([keys, new_keys]), return_inverse=True)
+    totals = np.zeros(merged.size, dtype=np.int64)
+    np.add.at(totals, inverse, np.concatenate([counts, new_counts]))
+    return merged, totals
+
+def chunk_totals(codes, num_faces):
+    """Return the totals of one chunk of codes as a tuple of (rolls, jackpots, per-face totals,
+    (combo keys, counts), (permutation keys, counts)).
+    """
+    return (codes.shape[0], int(jackpot_mask(codes).sum()), np.bincount(codes.ravel(), minlength=num_faces),
+            count_rows(codes, num_faces, combinations=True), count_rows(codes, num_faces))
@@ -0,0 +1,17 @@
+import importlib
+
+class LazyModule:
+    """
+    A stand-in for a module that is only imported the first time one of its attributes is used,
+    so code paths that never touch it don't pay for importing it.
+    """
+
+    def __init__(self, name):
+        """Initialization method, takes the full name of the module to import later."""
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attribute):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attribute)
@@ -0,0 +1,153 @@
+import warnings
+import numpy as np
+import pandas as pd
+from itertools import combinations_with_replacement
+from montecarlo import _kernels, simulator
+from montecarlo.simulator import Game, StreamingAnalyzer
+
+# Exact Analyzer Class
+
+class ExactAnalyzer:
+    """
+    A class computing the exact outcome distributions of a dice game from the dice weights, without rolling.
+    Mirrors the Analyzer methods but returns probabilities instead of counts.
+    Combination and permutation tables larger than max_states fall back to a seeded simulation.
+    """
+    
+    def __init__(self, game, max_states=2000000, fallback_rolls=1000000, seed=None):
+        """
+        Initialize an ExactAnalyzer with a Game object. The game does not need to have been played.
+        max_states caps how many outcomes are enumerated exactly; past it, fallback_rolls rolls
+        seeded with seed are simulated instead and a warning is raised.
+        Throws error is input, game, is not a Game object.
+        """
+        if not isinstance(game, Game):
+            raise ValueError("Input must be a Game object")
+        self.game = game
+        self.max_states = max_states
+        self.fallback_rolls = fallback_rolls
+        self.seed = seed
+        
+    def _probabilities(self):
+        """Return the face vocabulary and a (dice, faces) matrix of each die's probability of each face."""
+        faces, dtype, group_luts = self.game._plan()
+        probs = np.zeros((len(self.game.dice), faces.size))
+        for cols, lut, tables, which in group_luts:
+            for i, table in zip(cols, which):
+                probs[i, lut] = tables[table].probs
+        return faces, dtype, probs
+    
+    def jackpot(self):
+        """Return the probability that every die shows the same face on a roll."""
+        faces, dtype, probs = self._probabilities()
+        return float(probs.prod(axis=0).sum())
+    
+    def jackpot_faces(self):
+        """Return a Series of the probability of a jackpot on each face."""
+        faces, dtype, probs = self._probabilities()
+        return pd.Series(probs.prod(axis=0), index=pd.Index(faces, name='Face'), name='Probability')
+    
+    def face_counts_per_roll(self):
+        """
+        Compute the distribution of how many times each face appears in a roll.
+        Returns a DataFrame indexed by the count (0 to the number of dice) with one column per face
+        holding the probability of rolling that face that many times.
+        """
+        faces, dtype, probs = self._probabilities()
+        # Convolve in one die at a time; each die adds one to a face's count with that face's probability
+        dist = np.zeros((faces.size, len(self.game.dice) + 1))
+        dist[:, 0] = 1.0
+        for p in probs:
+            shifted = dist[:, :-1] * p[:, None]
+            dist *= (1.0 - p)[:, None]
+            dist[:, 1:] += shifted
+        return pd.DataFrame(dist.T, index=pd.RangeIndex(dist.shape[1], name='Count'), columns=faces)
+    
+    def combo_count(self):
+        """
+        Compute the probability of every distinct combination of faces.
+        Returns a DataFrame with MultiIndex of combinations (in face order) and a Probability column.
+        """
+        faces, dtype, probs = self._probabilities()
+        groups = _weight_groups(probs)
+        
+        # Estimate the states before enumerating: multisets per group of identical dice, multiplied
+        states = 1
+        for rows in groups:
+            support = np.count_nonzero(probs[rows[0]])
+            states *= _choose(support + len(rows) - 1, len(rows))
+        if states > self.max_states:
+            streaming = self._simulate(states)
+            return _frequencies(streaming.combo_count(), streaming.num_rolls)
+        
+        # Each group of identical dice is a multinomial over its nonzero faces; groups are then
+        # combined pairwise, merging equal combinations through their packed keys
+        combos, combo_probs = np.zeros((1, 0), dtype=dtype), np.ones(1)
+        for rows in groups:
+            rolls, roll_probs = _multinomial(probs[rows[0]], len(rows), dtype)
+            combos = np.concatenate([np.repeat(combos, len(rolls), axis=0),
+                                     np.tile(rolls, (len(combos), 1))], axis=1)
+            combos.sort(axis=1)
+            combo_probs = np.outer(combo_probs, roll_probs).ravel()
+            keys, inverse = np.unique(_kernels.pack_rows(combos, faces.size), return_inverse=True)
+            combo_probs = np.bincount(inverse, weights=combo_probs)
+            combos = _kernels.unpack_rows(keys, faces.size, combos.shape[1], dtype)
+        keys = _kernels.pack_rows(combos, faces.size)
+        return simulator._count_frame(keys, combo_probs, faces, combos.shape[1], dtype, 'Probability')
+    
+    def permutation_count(self):
+        """
+        Compute the probability of every distinct permutation of faces.
+        Returns a DataFrame with MultiIndex of permutations (in face order) and a Probability column.
+        """
+        faces, dtype, probs = self._probabilities()
+        supports = [np.flatnonzero(p).astype(dtype) for p in probs]
+        states = int(np.prod([support.size for support in supports], dtype=float))
+        if states > self.max_states:
+            streaming = self._simulate(states)
+            return _frequencies(streaming.permutation_count(), streaming.num_rolls)
+        
+        # Every tuple of nonzero faces, in order, with the product of the dice probabilities
+        perms = np.stack(np.meshgrid(*supports, indexing='ij'), axis=-1).reshape(-1, len(supports))
+        perm_probs = np.ones(len(perms))
+        for i, p in enumerate(probs):
+            perm_probs *= p[perms[:, i]]
+        keys = _kernels.pack_rows(perms, faces.size)
+        return simulator._count_frame(keys, perm_probs, faces, perms.shape[1], dtype, 'Probability')
+    
+    def _simulate(self, states):
+        """Roll fallback_rolls rolls of a copy of the game, returning the StreamingAnalyzer holding the counts."""
+        warnings.warn(f"{states} outcomes is more than max_states={self.max_states}, "
+                      f"estimating from {self.fallback_rolls} simulated rolls instead")
+        return StreamingAnalyzer(Game(self.game.dice)).run(self.fallback_rolls, seed=self.seed)
+
+def _frequencies(counts, num_rolls):
+    """Turn a Count table into a Probability table of relative frequencies."""
+    return (counts['Count'] / num_rolls).rename('Probability').to_frame()
+
+def _choose(n, k):
+    """Return n choose k."""
+    result = 1
+    for i in range(1, k + 1):
+        result = result * (n - k + i) // i
+    return result
+
+def _weight_groups(probs):
+    """Group the rows (dice) of probs that have identical face probabilities."""
+    groups = dict()
+    for i, p in enumerate(probs):
+        groups.setdefault(p.tobytes(), []).append(i)
+    return list(groups.values())
+
+def _multinomial(p, num_dice, dtype):
+    """Enumerate the sorted combinations of num_dice identical dice with face probabilities p,
+    skipping faces with zero probability, and return them with their multinomial probabilities.
+    """
+    support = np.flatnonzero(p)
+    rolls = np.array(list(combinations_with_replacement(support, num_dice)), dtype=dtype).reshape(-1, num_dice)
+    # Count how many of the dice show each face in each combination
+    counts = np.zeros((len(rolls), p.size), dtype=np.intp)
+    np.add.at(counts, (np.arange(len(rolls))[:, None], rolls), 1)
+    factorials = np.cumprod(np.concatenate([[1.0], np.arange(1, num_dice + 1)]))
+    coefficient = factorials[num_dice] / factorials[counts].prod(axis=1)
+    return rolls, coefficient * (p ** counts).prod(axis=1)
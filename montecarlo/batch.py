@@ -0,0 +1,117 @@
+import numpy as np
+import pandas as pd
+from montecarlo import _kernels
+from montecarlo.simulator import Game, _vocabulary, _code_dtype
+
+# Batch Analyzer Class
+
+class BatchAnalyzer:
+    """
+    A class analyzing the most recent plays of many games together.
+    Every game's rolls are stacked into one code matrix over a shared face vocabulary with a
+    game id per roll, so each statistic is computed for all the games in a single pass and
+    returned as one result indexed by game.
+    """
+
+    def __init__(self, games):
+        """
+        Initialize a BatchAnalyzer with a dict of name to Game, or a list of Game objects named
+        by their position.  The games must have been played and have the same number of dice,
+        but may use different faces and different numbers of rolls.
+        Throws error if any of the games is not a Game object.
+        """
+        if not isinstance(games, dict):
+            games = dict(enumerate(games))
+        if not games or not all(isinstance(game, Game) for game in games.values()):
+            raise ValueError("Input must be one or more Game objects")
+        encoded = [game._encoded() for game in games.values()]
+        if len({codes.shape[1] for codes, _ in encoded}) > 1:
+            raise ValueError("Every game must have the same number of dice")
+
+        self.games = games
+        self._faces = _vocabulary([faces for _, faces in encoded])
+        position = {face: i for i, face in enumerate(self._faces.tolist())}
+        dtype = _code_dtype(self._faces.size)
+        self._codes = np.concatenate([np.array([position[face] for face in faces.tolist()], dtype=dtype)[codes]
+                                      for codes, faces in encoded])
+        self._game_ids = np.repeat(np.arange(len(encoded)), [codes.shape[0] for codes, _ in encoded])
+        self._rolls = np.concatenate([game._roll_index().to_numpy() for game in games.values()])
+        self._names = pd.Index(list(games), name='Game')
+
+    @classmethod
+    def from_codes(cls, codes, faces, names=None):
+        """Build a BatchAnalyzer from a 3-D array of codes with shape (games, rolls, dice) indexing
+        into the array of faces, for outcomes already stacked outside of Game objects.
+        names labels the games and defaults to their position.
+        Throws error if a code doesn't index into faces or names doesn't give each game its own name.
+        """
+        codes, faces = np.asarray(codes), np.asarray(faces)
+        if codes.ndim != 3:
+            raise ValueError("codes must have shape (games, rolls, dice)")
+        if codes.size and (codes.min() < 0 or codes.max() >= faces.size):
+            raise ValueError(f"codes must be between 0 and {faces.size - 1}, one per face")
+        self = cls.__new__(cls)
+        self.games = None
+        self._faces = faces
+        self._codes = codes.reshape(-1, codes.shape[2]).astype(_code_dtype(self._faces.size), copy=False)
+        self._game_ids = np.repeat(np.arange(codes.shape[0]), codes.shape[1])
+        self._rolls = np.tile(np.arange(codes.shape[1]), codes.shape[0])
+        self._names = pd.Index(range(codes.shape[0]) if names is None else list(names), name='Game')
+        if not self._names.is_unique or len(self._names) != codes.shape[0]:
+            raise ValueError("names must give each game its own name")
+        return self
+
+    def jackpot(self):
+        """Return a Series of the number of jackpots in each game."""
+        counts = np.bincount(self._game_ids[_kernels.jackpot_mask(self._codes)], minlength=len(self._names))
+        return pd.Series(counts, index=self._names, name='Jackpots')
+
+    def face_counts(self):
+        """Return a DataFrame of how many times each face was rolled in each game, one row per game
+        and one column per face in the shared vocabulary.
+        """
+        num_faces = self._faces.size
+        cells = (self._game_ids[:, None] * num_faces + self._codes).ravel()
+        counts = np.bincount(cells, minlength=len(self._names) * num_faces)
+        return pd.DataFrame(counts.reshape(-1, num_faces), index=self._names, columns=self._faces)
+
+    def face_counts_per_roll(self):
+        """Return how many times each face appears in each roll, in the format of
+        Analyzer.face_counts_per_roll with the game added as the outer level of the index.
+        """
+        counts = _kernels.face_counts(self._codes, self._faces.size)
+        index = pd.MultiIndex.from_arrays([self._names[self._game_ids], self._rolls], names=['Game', 'Roll_Num'])
+        return pd.DataFrame(counts, index=index, columns=self._faces)
+
+    def combo_count(self):
+        """Return the distinct combinations rolled in each game and their counts, in the format of
+        Analyzer.combo_count with the game added as the outer level of the index.
+        """
+        return self._count_frame(np.sort(self._codes, axis=1))
+
+    def permutation_count(self):
+        """Return the distinct permutations rolled in each game and their counts, in the format of
+        Analyzer.permutation_count with the game added as the outer level of the index.
+        """
+        return self._count_frame(self._codes)
+
+    def _count_frame(self, codes):
+        """Count the distinct (game, row of codes) pairs and build the Count DataFrame."""
+        num_faces, num_dice = self._faces.size, codes.shape[1]
+        keys, inverse = np.unique(_kernels.pack_rows(codes, num_faces), return_inverse=True)
+        rows = _kernels.unpack_rows(keys, num_faces, num_dice, codes.dtype)
+        order = _kernels.row_order(keys, rows)
+        if order is not None:
+            # Rank the distinct rows in face order
+            rows = rows[order]
+            rank = np.empty(order.size, dtype=np.intp)
+            rank[order] = np.arange(order.size)
+            inverse = rank[inverse]
+
+        # One pass over every game at once: each (game, distinct row) pair gets its own key
+        pairs, counts = np.unique(self._game_ids * keys.size + inverse.ravel(), return_counts=True)
+        games, distinct = np.divmod(pairs, keys.size)
+        index = pd.MultiIndex(levels=[self._names] + [self._faces] * num_dice,
+                              codes=[games] + list(rows[distinct].T), names=['Game'] + [None] * num_dice,
+                              verify_integrity=False)
+        return pd.DataFrame({'Count': counts}, index=index)
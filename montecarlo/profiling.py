@@ -0,0 +1,127 @@
+import time
+import functools
+import tracemalloc
+from montecarlo._lazy import LazyModule
+
+pd = LazyModule('pandas')
+
+#Functions that can be instrumented, as (owner, attribute, stage name, rows function)
+_targets = []
+
+#The Stats object currently collecting, if any
+_active = None
+
+def register(owner, attribute, stage, rows=None):
+    """Register owner.attribute (a method of a class or a function of a module) to be timed as stage.
+    rows, if given, is called as rows(args, kwargs, result) and returns how many rows the call processed.
+    Nothing is wrapped until a Stats object is enabled, so registered functions cost nothing otherwise.
+    """
+    _targets.append((owner, attribute, stage, rows))
+
+# Stats Class
+
+class Stats:
+    """
+    A class collecting the call counts, wall time, rows processed and bytes allocated of each stage
+    of the simulator while it is enabled.  Use it as a context manager, or call enable and disable.
+    """
+
+    def __init__(self, memory=True):
+        """Initialization method.  Set memory to False to skip tracking allocations with tracemalloc,
+        which slows down code that allocates many small Python objects.
+        """
+        self.memory = memory
+        self._totals = dict()
+        self._originals = []
+        self._frames = []
+
+    def enable(self):
+        """Start collecting by swapping every registered function for a timed wrapper."""
+        global _active
+        if _active is not None:
+            raise RuntimeError("Another Stats object is already collecting")
+        _active = self
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        else:
+            self._started_tracing = False
+        for owner, attribute, stage, rows in _targets:
+            original = owner.__dict__[attribute]
+            self._originals.append((owner, attribute, original))
+            setattr(owner, attribute, self._wrap(original, stage, rows))
+        return self
+
+    def disable(self):
+        """Stop collecting and put the original functions back."""
+        global _active
+        for owner, attribute, original in reversed(self._originals):
+            setattr(owner, attribute, original)
+        self._originals = []
+        if self._started_tracing:
+            tracemalloc.stop()
+        _active = None
+
+    def __enter__(self):
+        return self.enable()
+
+    def __exit__(self, *exc):
+        self.disable()
+        return False
+
+    def reset(self):
+        """Clear everything collected so far."""
+        self._totals = dict()
+
+    def table(self):
+        """Return a DataFrame with one row per stage and columns calls, seconds, rows and bytes."""
+        df = pd.DataFrame.from_dict(self._totals, orient='index', columns=['calls', 'seconds', 'rows', 'bytes'])
+        df.index.name = 'Stage'
+        return df.sort_values('seconds', ascending=False)
+
+    def _wrap(self, func, stage, rows):
+        """Return func wrapped to add its call, time, rows and peak allocation to stage."""
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            self._enter()
+            start = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            finally:
+                seconds = time.perf_counter() - start
+                allocated = self._exit()
+            processed = rows(args, kwargs, result) if rows is not None else 0
+            calls, total_seconds, total_rows, total_bytes = self._totals.get(stage, (0, 0.0, 0, 0))
+            self._totals[stage] = (calls + 1, total_seconds + seconds, total_rows + processed,
+                                   total_bytes + allocated)
+            return result
+        return wrapper
+
+    def _enter(self):
+        """Start tracking the allocations of a stage, keeping the peak of any enclosing stage so far."""
+        if not self.memory:
+            return
+        current, peak = tracemalloc.get_traced_memory()
+        if self._frames:
+            self._frames[-1][1] = max(self._frames[-1][1], peak)
+        tracemalloc.reset_peak()
+        self._frames.append([current, current])
+
+    def _exit(self):
+        """Finish tracking a stage, returning how far its allocations peaked above where they started."""
+        if not self.memory:
+            return 0
+        start, peak = self._frames.pop()
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        if self._frames:
+            self._frames[-1][1] = max(self._frames[-1][1], peak)
+        return peak - start
+
+def profile(memory=True):
+    """Return a new Stats object to use as a context manager:
+
+        with profile() as stats:
+            game.play(10**6)
+        stats.table()
+    """
+    return Stats(memory)
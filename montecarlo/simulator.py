@@ -1,13 +1,55 @@
+import os
+import sys
+import warnings
 import numpy as np
-import pandas as pd
-from itertools import combinations_with_replacement, permutations
-from collections import Counter
+from montecarlo import profiling, _kernels
+from montecarlo._lazy import LazyModule
+
+#pandas is only imported once a DataFrame or Series is asked for, so rolling dice needs NumPy alone
+pd = LazyModule('pandas')
+
+#Shared generator used when rolling dice without a seed
+_rng = np.random.default_rng()
+
+def _generator(seed=None):
+    """Return seed if it is already a NumPy Generator, otherwise a new PCG64 Generator seeded with seed."""
+    if isinstance(seed, np.random.Generator):
+        return seed
+    return np.random.Generator(np.random.PCG64(seed))
+
+def _skip(rng, num_draws):
+    """Move rng forward by num_draws uniform draws without generating them.
+    PCG64 jumps there directly; Philox jumps whole counter blocks of four draws and discards the rest.
+    """
+    bit_generator = rng.bit_generator
+    if isinstance(bit_generator, (np.random.PCG64, np.random.PCG64DXSM)):
+        bit_generator.advance(num_draws)
+    elif isinstance(bit_generator, np.random.Philox):
+        blocks, rest = divmod(num_draws, 4)
+        bit_generator.advance(blocks)
+        rng.random(rest)
+    else:
+        raise ValueError("Skipping ahead needs a PCG64 or Philox generator")
+
+def _as_weights(weights, size):
+    """Return weights as a new float array of length size, raising TypeError if they aren't numbers.
+    The array is always a copy, so dice built from the same weights don't share them.
+    """
+    try:
+        weights = np.array(weights, dtype=float)
+    except ValueError:
+        raise TypeError("weights must be able to be converted to numbers")
+    if weights.shape != (size,):
+        raise ValueError(f"Expected {size} weights, got {weights.size}")
+    return weights
 
 #Die Class
 class Die:
-    def __init__(self,faces: np.array):
+    def __init__(self,faces: np.array,seed=None,weights=None):
         """Initialization method, ensure that input faces is a NumPy array of distinct string/numbers.
-        Defaults all weights to 1 for each face.
+        Defaults all weights to 1 for each face, or takes an optional array of weights, one per face.
+        Takes an optional seed (or NumPy Generator) giving the die its own reproducible generator,
+        otherwise rolls use a shared generator.
         """
         #first make sure faces is a NumPy array
         if type(faces) != np.ndarray:
@@ -18,8 +60,18 @@ class Die:
         if faces.size != np.unique(faces).size:
             raise ValueError("The values of input faces must be unique")
         
-        base_weight = [1.0]*faces.size
-        self.df = pd.DataFrame(index=faces, data={'Weight':base_weight})
+        if weights is None:
+            self._weights = np.ones(faces.size)
+        else:
+            self._weights = _as_weights(weights, faces.size)
+        self._faces = faces
+        #position of each face, for looking faces up without a pandas index
+        self._positions = {face: i for i, face in enumerate(faces.tolist())}
+        #the DataFrame shown by show_die, built on first use and again after a weight changes
+        self._df = None
+        #NumPy sampling table, built on the first roll and rebuilt after change_weight
+        self._sampler = None
+        self._rng = _rng if seed is None else _generator(seed)
         
     def change_weight(self,fval,weight):
         """Method to change the weight of a single side.  
@@ -27,7 +79,7 @@ class Die:
         Takes input fval representing the face value and weight representing the new weight.
         """
         #make sure it is a valid face name
-        if fval not in self.df.index:
+        if fval not in self._positions:
             raise IndexError("Your fval is not a valid face name")
         #Make sure the weight can be cast to a numeric
         try:
@@ -35,19 +87,107 @@ class Die:
         except ValueError :
             raise TypeError("weight must be able to be converted to a number")
             
-        self.df.loc[fval,'Weight'] = float(weight)
+        self._weights[self._positions[fval]] = float(weight)
+        #weights changed so the sampling table and DataFrame are stale
+        self._sampler = self._df = None
+        
+    def change_weights(self,fvals,weights):
+        """Method to change the weights of many sides in one step.
+        Takes an array of face values, fvals, and an array of their new weights of the same length.
+        Must ensure every fval is a valid face and the weights can be cast as numeric;
+        nothing is changed if any of them are not.  The sampling table is rebuilt once for the batch.
+        """
+        positions = [self._positions.get(fval, -1) for fval in np.asarray(fvals).tolist()]
+        if -1 in positions:
+            raise IndexError("Your fvals are not all valid face names")
+        weights = _as_weights(weights, len(positions))
         
-    def roll_die(self,num_rolls=1):
+        self._weights[positions] = weights
+        self._sampler = self._df = None
+    
+    @classmethod
+    def from_file(cls,path,seed=None):
+        """Method creating a die from a whitespace separated file of two columns, face and weight,
+        like english_letters.txt.  Faces are read as strings.
+        """
+        data = np.loadtxt(path, dtype=str, ndmin=2)
+        #rebuild the faces so their string width fits the faces rather than the weights
+        return cls(np.array(data[:, 0].tolist()), seed=seed, weights=data[:, 1])
+        
+    def _table(self):
+        """Method returning the die's sampling table, shared with every other die of the same weights.
+        The table is kept on the die and only looked up again after a weight has changed.
+        """
+        if self._sampler is None:
+            self._sampler = _kernels.sampling_table(self._weights)
+        return self._sampler
+    
+    def _roll_codes(self,num_rolls=1,rng=None):
+        """Method returning integer face codes (positions in the faces array) for num_rolls rolls.
+        Draws uniforms with a NumPy Generator (the die's own unless rng is given) and maps them through the sampling table.
+        """
+        rng = self._rng if rng is None else rng
+        return _kernels.sample([self._table()], rng.random(num_rolls))
+        
+    def roll_die(self,num_rolls=1,as_array=False,seed=None):
         """Method to roll the dice, returns a list of results. 
         Takes one optional parameter, num_rolls, identifying number of rolls desired, defaults to 1 roll.
+        Set as_array to True to get the results back as a NumPy array instead of a list.
+        Pass a seed (or NumPy Generator) to make this roll reproducible instead of using the die's generator.
         results are not stored internally"""
-        tmp = list(self.df.sample(n=num_rolls,replace=True,weights=self.df['Weight']).index)
-        return tmp
+        tmp = self._faces[self._roll_codes(num_rolls, None if seed is None else _generator(seed))]
+        if as_array:
+            return tmp
+        return tmp.tolist()
+    
+    @property
+    def df(self):
+        """A read-only snapshot of the die's faces and weights as a data frame, importing pandas on first use.
+        Each access returns a new copy, so editing it doesn't change the die; use change_weight or
+        change_weights for that.
+        """
+        if self._df is None:
+            self._df = pd.DataFrame(index=self._faces, data={'Weight': self._weights.copy()})
+        return self._df.copy()
     
     def show_die(self):
-        """Method returning the data frame representing the die"""
+        """Method returning the data frame representing the die, a snapshot as for df"""
         return self.df
     
+def _vocabulary(face_arrays):
+    """Return the sorted array of every distinct face across face_arrays.
+    Faces that can't be ordered against each other keep the order they first appear in.
+    """
+    if len({faces.dtype.kind for faces in face_arrays}) > 1:
+        face_arrays = [faces.astype(object) for faces in face_arrays]
+    faces = np.concatenate(face_arrays)
+    try:
+        return np.unique(faces)
+    except TypeError:
+        return np.array(list(dict.fromkeys(faces.tolist())), dtype=object)
+
+def _code_dtype(num_faces):
+    """Return the smallest unsigned integer dtype able to hold num_faces face codes."""
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if num_faces <= np.iinfo(dtype).max + 1:
+            return dtype
+    return np.uint64
+
+def _roll_plan(dice, plan, num_rolls, rng=_rng, block_rolls=65536):
+    """Roll every die num_rolls times following a plan from Game._plan, returning the code matrix.
+    The uniforms are drawn row by row as (block_rolls, len(dice)) blocks, so roll r always uses
+    draws r * len(dice) through (r + 1) * len(dice) - 1 of rng and the float draws never
+    take more than one block of memory.
+    """
+    faces, dtype, group_luts = plan
+    codes = np.empty((num_rolls, len(dice)), dtype=dtype)
+    for start in range(0, num_rolls, block_rolls):
+        draws = rng.random((min(block_rolls, num_rolls - start), len(dice)))
+        for cols, lut, tables, which in group_luts:
+            # Translate the group's own face positions into game vocabulary codes
+            codes[start:start + len(draws), cols] = lut[_kernels.sample(tables, draws[:, cols], which)]
+    return codes
+
 #Game Class
 
 class Game:
@@ -58,38 +198,238 @@ class Game:
     def __init__(self,dice):
         """Initialization method, takes a list of die objects, dice."""
         self.dice=dice
+        #bumped by every play so analyzers know when their cached results are stale
+        self._version = 0
+        #running totals of the most recent play when it was played with aggregate=True
+        self._totals = None
+    
+    def play(self, num_rolls, seed=None, start_roll=0, aggregate=False, chunk_size=100000):
+        """Takes the number of rolls as only required parameter, num_rolls.  
+        Creates/updates the private outcome object with the results.
+        Dice sharing the same faces are rolled together in one matrix draw and the
+        outcome is kept as a matrix of small integer codes into the game's face vocabulary
+        until show_outcome is called.
+        Pass a seed (or PCG64/Philox NumPy Generator) for a reproducible play.  With a seed, start_roll
+        skips the generator straight to that roll, so play(n, seed, start_roll=k) gives rolls k to k + n - 1
+        of the seeded run without rolling the earlier ones.
+        Set aggregate to True to keep only running totals (per-face totals, the jackpot tally and the
+        counts of each distinct combination and permutation), rolling chunk_size rolls at a time and
+        dropping each chunk once counted.  Memory then grows with the distinct outcomes instead of the
+        rolls; the Analyzer reads the totals directly, but per-roll views are not available.
+        """
+        plan = self._plan()
+        rng = self._generator(seed, start_roll)
+        if not aggregate:
+            self._store(plan, _roll_plan(self.dice, plan, num_rolls, rng), start_roll)
+            return
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        totals = StreamingAnalyzer(self)
+        for start in range(0, num_rolls, chunk_size) if num_rolls else [0]:
+            codes = _roll_plan(self.dice, plan, min(chunk_size, num_rolls - start), rng)
+            totals._fold(plan[0], plan[1], len(self.dice), _kernels.chunk_totals(codes, plan[0].size))
+        self._store(plan, None, start_roll, totals)
+    
+    def play_chunks(self, num_rolls, chunk_size=100000, seed=None, start_roll=0):
+        """Generator playing num_rolls rolls in chunks of at most chunk_size rolls, so memory stays bounded.
+        After each chunk the game holds only that chunk as its most recent play, numbered from its
+        position in the whole run, and the generator yields the number of rolls in the chunk.
+        seed and start_roll work like they do for play, so an interrupted seeded run can be resumed.
+        Use a StreamingAnalyzer to accumulate statistics across the chunks.
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        plan = self._plan()
+        rng = self._generator(seed, start_roll)
+        for start in range(start_roll, start_roll + num_rolls, chunk_size):
+            size = min(chunk_size, start_roll + num_rolls - start)
+            self._store(plan, _roll_plan(self.dice, plan, size, rng), start)
+            yield size
+    
+    def _generator(self, seed, start_roll):
+        """Method returning the generator for a play, moved forward to start_roll when seeded."""
+        if seed is None:
+            if start_roll:
+                raise ValueError("start_roll needs a seed")
+            return _rng
+        rng = _generator(seed)
+        _skip(rng, start_roll * len(self.dice))
+        return rng
     
-    def play(self, num_rolls):
-        """Takes the number of rolls as only parameter, num_rolls.  
-        Creates/updates the private outcome object with the results"""
-        result_d = dict()
+    def play_parallel(self, num_rolls, seed=None, workers=None, block_size=100000, aggregate=False):
+        """Play num_rolls rolls across a pool of worker processes and store them like play does.
+        The rolls are split into blocks of block_size and every block gets its own child of
+        numpy.random.SeedSequence(seed), so a given seed and block_size give the same outcome
+        whatever the number of workers.  workers defaults to the number of CPUs; 1 runs in this process.
+        Set aggregate to True to keep only running totals, as for play; workers then send back only
+        the totals of their blocks.
+        """
+        plan = self._plan()
+        if aggregate:
+            totals = StreamingAnalyzer(self).run_parallel(num_rolls, seed, workers, block_size)
+            if not num_rolls:
+                # No blocks were rolled, so fold an empty one to fix the layout as play does
+                empty = np.empty((0, len(self.dice)), dtype=plan[1])
+                totals._fold(plan[0], plan[1], len(self.dice), _kernels.chunk_totals(empty, plan[0].size))
+            self._store(plan, None, 0, totals)
+            return
+        codes = np.empty((num_rolls, len(self.dice)), dtype=plan[1])
+        start = 0
+        for block in _map_blocks(_play_block, self.dice, plan, num_rolls, seed, workers, block_size):
+            codes[start:start + block.shape[0]] = block
+            start += block.shape[0]
+        self._store(plan, codes, 0)
+    
+    def _plan(self):
+        """Method working out, once per play, the face vocabulary, the code dtype and the groups of dice
+        sharing a face set.  Each group has the lookup from its face positions to vocabulary codes, its
+        distinct sampling tables (dice with identical weights share one) and which table each die uses.
+        """
+        # Group the dice by face set so each group is a single draw
+        groups = dict()
         for i, die in enumerate(self.dice):
-            vals = die.roll_die(num_rolls)
-            result_d[i] = vals
-            
-        # Create a DataFrame from the dictionary of results
-        self._outcome = pd.DataFrame(result_d)
-        self._outcome.index.name = 'Roll_Num'
-        self._outcome.columns.name = 'Die_Num'
-
-
+            groups.setdefault(tuple(die._faces.tolist()), []).append(i)
+        
+        faces = _vocabulary([die._faces for die in self.dice])
+        lookup = {face: code for code, face in enumerate(faces.tolist())}
+        dtype = _code_dtype(faces.size)
+        
+        group_luts = []
+        for cols in groups.values():
+            lut = np.array([lookup[face] for face in self.dice[cols[0]]._faces.tolist()], dtype=dtype)
+            # Identical dice get the same table from the shared cache, so dedupe by identity
+            tables = dict()
+            which = np.array([tables.setdefault(id(table), (len(tables), table))[0]
+                              for table in (self.dice[i]._table() for i in cols)], dtype=np.intp)
+            group_luts.append((cols, lut, [table for _, table in tables.values()], which))
+        return faces, dtype, group_luts
+    
+    def _store(self, plan, codes, first_roll, totals=None):
+        """Method keeping codes as the most recent play; the DataFrame is built lazily.
+        An aggregate play keeps its StreamingAnalyzer totals instead, with codes None.
+        """
+        self._codes = codes
+        self._faces = plan[0]
+        self._first_roll = first_roll
+        self._totals = totals
+        self._outcome = None
+        self._version += 1
+    
+    def save(self, path):
+        """Method saving the most recent play to the directory path: the code matrix as codes.npy,
+        the face vocabulary as faces.npy, and the dice and roll numbering as game.json.
+        A vocabulary of mixed face types has no fixed-width dtype, so it goes in game.json instead
+        and nothing is ever pickled.  Use Game.load to read it back.
+        Throws error, before writing anything, if the faces can't be written as JSON (bytes faces, say).
+        """
+        import json
+        codes, faces = self._encoded()
+        meta = {'first_roll': self._first_roll,
+                'dice': [{'faces': die._faces.tolist(), 'dtype': die._faces.dtype.str,
+                          'weights': die._weights.tolist()} for die in self.dice]}
+        if faces.dtype.kind == 'O':
+            meta['faces'] = faces.tolist()
+        try:
+            text = json.dumps(meta)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"The faces of this game can't be saved: {e}")
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, 'codes.npy'), np.ascontiguousarray(codes))
+        if faces.dtype.kind != 'O':
+            np.save(os.path.join(path, 'faces.npy'), faces)
+        with open(os.path.join(path, 'game.json'), 'w') as f:
+            f.write(text)
+    
+    @classmethod
+    def load(cls, path, mmap=True):
+        """Method creating a Game from a directory written by save, with the saved play as its most recent play.
+        By default the code matrix is memory-mapped read-only rather than read into memory, so show_outcome
+        and the Analyzer methods read it from disk as they go; a StreamingAnalyzer's scan bounds the memory used.
+        """
+        import json
+        with open(os.path.join(path, 'game.json')) as f:
+            meta = json.load(f)
+        dice = []
+        for saved in meta['dice']:
+            dice.append(Die(np.array(saved['faces'], dtype=saved['dtype']), weights=saved['weights']))
+        game = cls(dice)
+        codes = np.load(os.path.join(path, 'codes.npy'), mmap_mode='r' if mmap else None)
+        if 'faces' in meta:
+            faces = np.array(meta['faces'], dtype=object)
+        else:
+            faces = np.load(os.path.join(path, 'faces.npy'), allow_pickle=False)
+        game._store((faces, codes.dtype, None), codes, meta['first_roll'])
+        return game
+    
+    def _encoded(self):
+        """Method returning the outcome of the most recent play as a tuple of
+        (code matrix with one row per roll and one column per die, face vocabulary).
+        Throws error if the most recent play only kept aggregates.
+        """
+        if self._codes is None:
+            raise ValueError("The most recent play only kept aggregates; play without aggregate for per-roll results")
+        return self._codes, self._faces
+    
+    def _layout(self):
+        """Method returning the face vocabulary, number of dice and code dtype of the most recent play,
+        whether it kept every roll or only aggregates.
+        """
+        if self._totals is not None:
+            return self._faces, self._totals._num_dice, self._totals._dtype
+        return self._faces, self._codes.shape[1], self._codes.dtype
+    
+    def _num_rolls(self):
+        """Method returning how many rolls the most recent play had."""
+        return self._totals.num_rolls if self._totals is not None else self._codes.shape[0]
+    
+    def _roll_index(self):
+        """Method returning the roll numbers of the most recent play."""
+        return pd.RangeIndex(self._first_roll, self._first_roll + self._codes.shape[0], name='Roll_Num')
+    
+    def _wide(self):
+        """Method building (once per play) the wide DataFrame of categorical face columns from the stored codes."""
+        if self._outcome is None:
+            result_d = {i: pd.Categorical.from_codes(self._codes[:, i], categories=self._faces)
+                        for i in range(self._codes.shape[1])}
+            self._outcome = pd.DataFrame(result_d, index=self._roll_index())
+            self._outcome.columns.name = 'Die_Num'
+        return self._outcome
         
     def show_outcome(self,view="wide"):
         """Method returning the result. Options include wide and narrow, default value of wide. 
         Narrow is a stacked version of the wide format with MultiIndex.
         """
+        self._encoded()
         if view.upper() == "WIDE":
-            return self._outcome
+            return self._wide()
         elif view.upper() == "NARROW":
-            # Stack the columns to create a MultiIndex with roll number and die number
-            narrow_df = self._outcome.stack().reset_index()
-            # Rename columns appropriately
-            narrow_df.columns = ['Roll Number', 'Die Number', 'Outcome']
-            # Set MultiIndex using roll number and die number
-            narrow_df = narrow_df.set_index(['Roll Number', 'Die Number'])
-            return narrow_df
+            return self._narrow(0, self._codes.shape[0])
         else:
             raise ValueError("view must be either wide or narrow")
+    
+    def narrow_chunks(self, chunk_size=100000):
+        """Generator yielding the narrow view of the most recent play chunk_size rolls at a time,
+        for writing the long format out to disk without building all of it at once.
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        self._encoded()
+        for start in range(0, self._codes.shape[0], chunk_size):
+            yield self._narrow(start, min(start + chunk_size, self._codes.shape[0]))
+    
+    def _narrow(self, start, stop):
+        """Method building the narrow view of rolls start to stop - 1 of the most recent play.
+        The MultiIndex is made straight from repeated roll and tiled die positions, and the
+        outcome column is the raveled code matrix, so the outcome is never stacked or copied.
+        """
+        codes = np.ascontiguousarray(self._codes[start:stop])
+        num_rolls, num_dice = codes.shape
+        index = pd.MultiIndex(
+            levels=[pd.RangeIndex(self._first_roll + start, self._first_roll + stop), pd.RangeIndex(num_dice)],
+            codes=[np.repeat(np.arange(num_rolls), num_dice), np.tile(np.arange(num_dice), num_rolls)],
+            names=['Roll Number', 'Die Number'], verify_integrity=False)
+        outcome = pd.Categorical.from_codes(codes.ravel(), categories=self._faces)
+        return pd.DataFrame({'Outcome': outcome}, index=index)
 
 # Analyzer Class
 
@@ -97,84 +437,510 @@ class Analyzer:
     """
     A class to analyze the results of a dice game.
     Takes the results of a single game and computes various descriptive statistical properties about it.
+    Results and the intermediates they share are cached until the game is played again.
     """
     
-    def __init__(self, game):
+    def __init__(self, game, max_cache_bytes=256 * 2**20):
         """
         Initialize an Analyzer with a Game object.
+        max_cache_bytes bounds the memory held by cached results; the least recently used are dropped first.
         Throws error is input, game, is not a Game object.
         """
         if not isinstance(game, Game):
             raise ValueError("Input must be a Game object")
         self.game = game
+        self.max_cache_bytes = max_cache_bytes
+        self._cache = dict()
+        self._cache_bytes = 0
+        self._cache_version = None
+        
+    def _cached(self, key, compute):
+        """Return the cached value for key, calling compute to fill it in on a miss.
+        The whole cache is dropped when the game's version has changed since it was filled.
+        """
+        if self._cache_version != self.game._version:
+            self._cache.clear()
+            self._cache_bytes = 0
+            self._cache_version = self.game._version
+        if key in self._cache:
+            # Reinsert so the dict's order runs from least to most recently used
+            self._cache[key] = self._cache.pop(key)
+            return self._cache[key][0]
+        
+        value = compute()
+        size = _nbytes(value)
+        if size <= self.max_cache_bytes:
+            self._cache[key] = (value, size)
+            self._cache_bytes += size
+            while self._cache_bytes > self.max_cache_bytes:
+                _, evicted = self._cache.pop(next(iter(self._cache)))
+                self._cache_bytes -= evicted
+        return value
+    
+    def _aggregates(self):
+        """Return the game's running totals if its most recent play only kept aggregates, else None."""
+        return self.game._totals
+    
+    def _jackpot_mask(self):
+        """Return the cached boolean array flagging the jackpot rolls."""
+        return self._cached('jackpot_mask', lambda: _kernels.jackpot_mask(self.game._encoded()[0]))
+    
+    def _perm_counts(self):
+        """Return the cached distinct packed permutation keys and their counts."""
+        totals = self._aggregates()
+        if totals is not None:
+            return totals._perm_keys, totals._perm_counts
+        codes, faces = self.game._encoded()
+        return self._cached('perm_counts', lambda: _kernels.count_rows(codes, faces.size))
+    
+    def _combo_counts(self):
+        """Return the cached distinct packed combination keys and their counts."""
+        totals = self._aggregates()
+        if totals is not None:
+            return totals._combo_keys, totals._combo_counts
+        codes, faces = self.game._encoded()
+        # Sort each roll (order-independent); codes sort in face order
+        return self._cached('combo_counts',
+                            lambda: _kernels.count_rows(codes, faces.size, combinations=True))
         
     def jackpot(self):
         """ Compute how many times the game resulted in all faces being the same.
         Takes no input and returns the number of jackpots as a number.
         """
-        # Get the results in wide format
-        results = self.game.show_outcome("wide")
-        # Check each row (roll) to see if all values in that roll are the same
-        jackpots = results.apply(lambda x: x.nunique() == 1, axis=1)
-        return int(jackpots.sum())
+        totals = self._aggregates()
+        if totals is not None:
+            return totals.jackpot()
+        return self._cached('jackpot', lambda: int(self._jackpot_mask().sum()))
+    
+    def jackpot_detail(self):
+        """
+        Compute the jackpots along with where they happened and which faces they were on, in one pass.
+        Returns a tuple of (Index of the roll numbers that were jackpots,
+        Series of the number of jackpots on each face).
+        """
+        rolls, face_dist = self._cached('jackpot_detail', self._jackpot_detail)
+        return rolls, face_dist.copy()
+    
+    def _jackpot_detail(self):
+        """Compute the uncached result of jackpot_detail."""
+        codes, faces = self.game._encoded()
+        rolls = np.flatnonzero(self._jackpot_mask())
+        # Every die shows the same face in a jackpot roll so the first column identifies it
+        counts = np.bincount(codes[rolls, 0], minlength=faces.size)
+        face_dist = pd.Series(counts, index=pd.Index(faces, name='Face'), name='Jackpots')
+        return self.game._roll_index()[rolls], face_dist
+    
+    def face_counts(self):
+        """
+        Compute how many times each face was rolled over the whole game.
+        Returns a Series of counts indexed by face, in face order.
+        """
+        totals = self._aggregates()
+        if totals is not None:
+            return totals.face_counts()
+        return self._cached('face_counts', self._face_counts).copy()
+    
+    def _face_counts(self):
+        """Compute the uncached result of face_counts."""
+        codes, faces = self.game._encoded()
+        counts = np.bincount(np.asarray(codes).ravel(), minlength=faces.size)
+        return pd.Series(counts, index=pd.Index(faces, name='Face'), name='Count')
     
-    def face_counts_per_roll(self):
+    def face_counts_per_roll(self, sparse=False):
         """
         Compute how many times each face appears in each roll.
-        The result is a DataFrame.
+        The result is an integer DataFrame with one column per face in the game, in face order.
+        Set sparse to True to get pandas sparse columns instead, useful for dice with many faces.
         """
-        # Get results in wide format
-        results = self.game.show_outcome("wide")
-        # Get unique faces from the results
-        all_faces = pd.unique(results.values.ravel())
+        return self._cached(('face_counts_per_roll', sparse), lambda: self._face_counts_per_roll(sparse)).copy()
+    
+    def _face_counts_per_roll(self, sparse):
+        """Compute the uncached result of face_counts_per_roll."""
+        # Get the results as integer face codes
+        codes, faces = self.game._encoded()
+        num_rolls, num_dice = codes.shape
+        index = self.game._roll_index()
+        dtype = np.min_scalar_type(-num_dice)
         
-        # Create a new dataframe to store counts
-        counts_df = pd.DataFrame(index=results.index)
+        if not sparse:
+            return pd.DataFrame(_kernels.face_counts(codes, faces.size), index=index, columns=faces)
         
-        # For each face, count occurrences in each roll
-        for face in all_faces:
-            counts_df[face] = results.apply(lambda x: (x == face).sum(), axis=1)
-            
-        return counts_df
+        # Key every (face, roll) cell by code * num_rolls + roll, so sorting the keys groups
+        # the nonzero cells by face and orders them by roll within each face
+        keys = codes.astype(np.intp) * num_rolls + np.arange(num_rolls)[:, None]
+        cells, cell_counts = np.unique(keys, return_counts=True)
+        bounds = np.searchsorted(cells, np.arange(faces.size + 1) * num_rolls)
+        rolls, cell_counts = (cells % num_rolls).astype(np.int32), cell_counts.astype(dtype)
+        
+        # Each face's cells become the indices and values of its sparse column directly
+        counts_d = dict()
+        for j, face in enumerate(faces):
+            cell = slice(bounds[j], bounds[j + 1])
+            counts_d[face] = _sparse_column(rolls[cell], cell_counts[cell], num_rolls)
+        return pd.DataFrame(counts_d, index=index)
     
-    def combo_count(self):
+    def combo_count(self, approximate=False):
         """
         Compute the distinct combinations of faces rolled along with their counts.
         Returns a DataFrame with MultiIndex of distinct combinations and a column for the associated counts
+        Set approximate to True, or to a dict of montecarlo.sketch.OutcomeSketch settings, to get only the
+        most frequent combinations with estimated counts from a sketch of bounded size (see combo_sketch).
         """
-        # Get results in wide format
-        results = self.game.show_outcome("wide")
-        
-        # Convert each roll to a sorted tuple (order-independent)
-        combos = results.apply(lambda x: tuple(sorted(x)), axis=1)
-        
-        # Count occurrences of each combination
-        combo_counts = Counter(combos)
-        
-        # Convert to dataframe with MultiIndex
-        df = pd.DataFrame.from_dict(combo_counts, orient='index', columns=['Count'])
-        df.index = pd.MultiIndex.from_tuples(df.index)
-        
-        return df
+        if approximate:
+            return self.combo_sketch(**_sketch_settings(approximate)).count_frame()
+        return self._cached('combo_count', lambda: self._count_frame(*self._combo_counts())).copy()
     
-    def permutation_count(self):
+    def permutation_count(self, approximate=False):
         """
         Compute the distinct permutations of faces rolled along with their counts.
         Permutations are order-dependent and may contain repetitions.
         
         Returns a dataframe with MultiIndex of distinct permutations and a column for the associated counts
+        approximate works as for combo_count.
         """
-        # Get results in wide format
-        results = self.game.show_outcome("wide")
+        if approximate:
+            return self.permutation_sketch(**_sketch_settings(approximate)).count_frame()
+        return self._cached('permutation_count', lambda: self._count_frame(*self._perm_counts())).copy()
+    
+    def combo_sketch(self, **settings):
+        """
+        Return a montecarlo.sketch.OutcomeSketch of the combinations rolled, built settings
+        (width, depth, top, precision) and fed a chunk of rolls at a time, for estimating the number of
+        distinct combinations, the most frequent ones and the count of any one, in bounded memory.
+        """
+        return self._sketch(True, settings)
+    
+    def permutation_sketch(self, **settings):
+        """Return a montecarlo.sketch.OutcomeSketch of the permutations rolled, as for combo_sketch."""
+        return self._sketch(False, settings)
+    
+    def _sketch(self, combinations, settings):
+        """Build and fill an OutcomeSketch of the game's combinations or permutations."""
+        from montecarlo.sketch import OutcomeSketch
+        sketch = OutcomeSketch(combinations=combinations, **settings)
+        if self._aggregates() is not None:
+            sketch._bind(*self.game._layout())
+            sketch.add(*(self._combo_counts() if combinations else self._perm_counts()))
+            return sketch
+        codes, faces = self.game._encoded()
+        sketch._bind(faces, codes.shape[1], codes.dtype)
+        for start in range(0, codes.shape[0], _SKETCH_CHUNK):
+            sketch.update(np.asarray(codes[start:start + _SKETCH_CHUNK]), faces)
+        return sketch
+    
+    def word_count(self, words):
+        """
+        Compute the distinct permutations that spell a word in words (a montecarlo.words.WordList)
+        along with their counts.  Only the distinct permutations are checked against the word list.
+        Returns a dataframe in the same format as permutation_count
+        """
+        return self._cached(('word_count', words), lambda: _word_frame(
+            *self._perm_counts(), *self.game._layout(), words)).copy()
+    
+    def _count_frame(self, keys, counts):
+        """Convert distinct packed keys of the game's codes and their counts to a dataframe with MultiIndex."""
+        return _count_frame(keys, counts, *self.game._layout())
+
+# Streaming Analyzer Class
+
+class StreamingAnalyzer:
+    """
+    A class accumulating the statistics of a dice game across the chunks of Game.play_chunks.
+    Memory grows with the number of distinct outcomes, not with the number of rolls.
+    """
+    
+    def __init__(self, game, approximate=False):
+        """
+        Initialize a StreamingAnalyzer with a Game object and empty totals.
+        Set approximate to True, or to a dict of montecarlo.sketch.OutcomeSketch settings, to count
+        combinations and permutations in sketches of fixed size instead of exact tables, so memory
+        stays bounded however many distinct outcomes there are.
+        Throws error is input, game, is not a Game object.
+        """
+        if not isinstance(game, Game):
+            raise ValueError("Input must be a Game object")
+        self.game = game
+        self.num_rolls = 0
+        self._faces = None
+        self._jackpots = 0
+        self._face_totals = None
+        self._combo_keys = self._combo_counts = None
+        self._perm_keys = self._perm_counts = None
+        self._combo_sketch = self._perm_sketch = None
+        if approximate:
+            from montecarlo.sketch import OutcomeSketch
+            self._combo_sketch = OutcomeSketch(combinations=True, **_sketch_settings(approximate))
+            self._perm_sketch = OutcomeSketch(**_sketch_settings(approximate))
         
-        # Convert each roll to a tuple (maintaining order)
-        perms = results.apply(lambda x: tuple(x), axis=1)
+    def update(self):
+        """Fold the game's most recent play (usually one chunk) into the running totals."""
+        codes, faces = self.game._encoded()
+        self._fold(faces, codes.dtype, codes.shape[1], _kernels.chunk_totals(codes, faces.size))
         
-        # Count occurrences of each permutation
-        perm_counts = Counter(perms)
+    def scan(self, chunk_size=100000):
+        """Fold the game's most recent play into the running totals chunk_size rolls at a time,
+        so a memory-mapped play from Game.load is analyzed without reading it all into memory.
+        """
+        codes, faces = self.game._encoded()
+        for start in range(0, codes.shape[0], chunk_size):
+            chunk = np.asarray(codes[start:start + chunk_size])
+            self._fold(faces, codes.dtype, codes.shape[1], _kernels.chunk_totals(chunk, faces.size))
+        return self
+    
+    def run(self, num_rolls, chunk_size=100000, seed=None, start_roll=0):
+        """Play num_rolls rolls of the game in chunks of chunk_size, updating the totals after each chunk.
+        seed and start_roll are passed on to Game.play_chunks.
+        """
+        for _ in self.game.play_chunks(num_rolls, chunk_size, seed, start_roll):
+            self.update()
+        return self
+    
+    def run_parallel(self, num_rolls, seed=None, workers=None, block_size=100000):
+        """Play num_rolls rolls of the game across a pool of worker processes, each worker returning
+        only the totals of its blocks.  Seeding works like Game.play_parallel, so a given seed and
+        block_size give the same totals whatever the number of workers.
+        """
+        faces, dtype, group_luts = plan = self.game._plan()
+        for totals in _map_blocks(_count_block, self.game.dice, plan, num_rolls, seed, workers, block_size):
+            self._fold(faces, dtype, len(self.game.dice), totals)
+        return self
+    
+    def run_until(self, tolerance, target='jackpot', confidence=0.95, chunk_size=100000,
+                  min_rolls=1000, max_rolls=10**9, seed=None, start_roll=0):
+        """Play the game in batches until the confidence interval of target's rate is within
+        plus or minus tolerance, then return the interval as from the interval method.
+        target is 'jackpot' or a tuple of faces for the rate of that combination.
+        After the first batch of min_rolls, each batch is sized from the current estimate to be
+        about what is still needed, capped at chunk_size.  Stops with a warning at max_rolls.
+        A seeded run gives the same rolls as Game.play with that seed, whatever the batch sizes.
+        """
+        if tolerance <= 0:
+            raise ValueError("tolerance must be positive")
+        if min_rolls < 1 or max_rolls < 1:
+            raise ValueError("min_rolls and max_rolls must be at least 1")
+        z = _z_score(confidence)
+        plan = self.game._plan()
+        rng = self.game._generator(seed, start_roll)
+        start, size = start_roll, min(min_rolls, chunk_size, max_rolls)
+        while size > 0:
+            self.game._store(plan, _roll_plan(self.game.dice, plan, size, rng), start)
+            self.update()
+            start += size
+            result = self.interval(target, confidence)
+            if result['Half Width'] <= tolerance:
+                return result
+            rate = min(max(result['Estimate'], 1 / self.num_rolls), 0.5)
+            needed = int(np.ceil(z * z * rate * (1 - rate) / tolerance ** 2)) - self.num_rolls
+            size = min(max(needed, min_rolls), chunk_size, start_roll + max_rolls - start)
+        warnings.warn(f"Stopped at max_rolls={max_rolls} with a half width of {result['Half Width']:.3g}, "
+                      f"more than tolerance={tolerance}")
+        return result
+    
+    def interval(self, target='jackpot', confidence=0.95):
+        """Return a Series with the rolls so far and the estimate, Wilson score confidence interval
+        and half width of the interval for target's rate.
+        target is 'jackpot' or a tuple of faces for the rate of that combination.
+        """
+        if not self.num_rolls:
+            raise ValueError("No rolls yet")
+        z = _z_score(confidence)
+        n = self.num_rolls
+        rate = self._target_count(target) / n
+        center = (rate + z * z / (2 * n)) / (1 + z * z / n)
+        half = z * np.sqrt(rate * (1 - rate) / n + z * z / (4 * n * n)) / (1 + z * z / n)
+        return pd.Series({'Rolls': n, 'Estimate': rate, 'Lower': center - half, 'Upper': center + half,
+                          'Half Width': half})
+    
+    def _target_count(self, target):
+        """Return how many of the rolls so far hit target, 'jackpot' or a tuple of faces of a combination."""
+        if isinstance(target, str) and target == 'jackpot':
+            return self._jackpots
+        self._check_folded()
+        if len(target) != self._num_dice:
+            raise ValueError(f"A combination needs one face per die ({self._num_dice})")
+        codes = np.searchsorted(self._faces, np.array(target, dtype=self._faces.dtype))
+        if (codes >= self._faces.size).any() or (self._faces[codes.clip(0, self._faces.size - 1)] != target).any():
+            raise ValueError(f"{target} has a face that isn't on the dice")
+        if self._combo_sketch is not None:
+            return int(self._combo_sketch.count([target]).iloc[0])
+        key = _kernels.pack_rows(np.sort(codes).astype(self._dtype)[None, :], self._faces.size)
+        return int(self._combo_counts[self._combo_keys == key[0]].sum())
+    
+    def _fold(self, faces, dtype, num_dice, totals):
+        """Add the totals from _kernels.chunk_totals for rolls over faces into the running totals."""
+        if self._faces is None:
+            self._faces = faces
+            self._dtype, self._num_dice = dtype, num_dice
+            self._face_totals = np.zeros(faces.size, dtype=np.int64)
+            for sketch in (self._combo_sketch, self._perm_sketch):
+                if sketch is not None:
+                    sketch._bind(faces, num_dice, dtype)
+        elif not np.array_equal(faces, self._faces):
+            raise ValueError("The game's faces changed between chunks")
         
-        # Convert to dataframe with MultiIndex
-        df = pd.DataFrame.from_dict(perm_counts, orient='index', columns=['Count'])
-        df.index = pd.MultiIndex.from_tuples(df.index)
+        num_rolls, jackpots, face_totals, combos, perms = totals
+        self.num_rolls += num_rolls
+        self._jackpots += jackpots
+        self._face_totals += face_totals
+        if self._combo_sketch is not None:
+            self._combo_sketch.add(*combos)
+            self._perm_sketch.add(*perms)
+            return
+        self._combo_keys, self._combo_counts = _kernels.merge_counts(self._combo_keys, self._combo_counts, *combos)
+        self._perm_keys, self._perm_counts = _kernels.merge_counts(self._perm_keys, self._perm_counts, *perms)
         
-        return df
+    def _check_folded(self):
+        """Throws error if no chunk has been folded in yet, so the faces and dice are not known."""
+        if self._faces is None:
+            raise ValueError("No chunks analysed yet")
+    
+    def jackpot(self):
+        """Return the number of jackpots seen so far as a number."""
+        return self._jackpots
+    
+    def face_counts(self):
+        """Return a Series of how many times each face has been rolled so far, in face order."""
+        self._check_folded()
+        return pd.Series(self._face_totals, index=pd.Index(self._faces, name='Face'), name='Count')
+    
+    def combo_count(self):
+        """Return the distinct combinations seen so far and their counts, in the same format as Analyzer.combo_count.
+        When approximate, only the most frequent combinations are returned, as from OutcomeSketch.count_frame.
+        """
+        self._check_folded()
+        if self._combo_sketch is not None:
+            return self._combo_sketch.count_frame()
+        return _count_frame(self._combo_keys, self._combo_counts, self._faces, self._num_dice, self._dtype)
+    
+    def permutation_count(self):
+        """Return the distinct permutations seen so far and their counts, in the same format as Analyzer.permutation_count.
+        When approximate, only the most frequent permutations are returned, as from OutcomeSketch.count_frame.
+        """
+        self._check_folded()
+        if self._perm_sketch is not None:
+            return self._perm_sketch.count_frame()
+        return _count_frame(self._perm_keys, self._perm_counts, self._faces, self._num_dice, self._dtype)
+    
+    def combo_sketch(self):
+        """Return the OutcomeSketch of the combinations seen so far when approximate, otherwise None."""
+        return self._combo_sketch
+    
+    def permutation_sketch(self):
+        """Return the OutcomeSketch of the permutations seen so far when approximate, otherwise None."""
+        return self._perm_sketch
+    
+    def word_count(self, words):
+        """Return the distinct permutations seen so far that spell a word in words, in the same format as Analyzer.word_count."""
+        self._check_folded()
+        if self._perm_sketch is not None:
+            raise ValueError("Word counts need exact permutation counts")
+        return _word_frame(self._perm_keys, self._perm_counts, self._faces, self._num_dice, self._dtype, words)
+
+#Rows fed to an OutcomeSketch at a time, bounding the packed keys held at once
+_SKETCH_CHUNK = 2**20
+
+def _sketch_settings(approximate):
+    """Return the OutcomeSketch settings from an approximate argument, True or a dict of settings."""
+    return approximate if isinstance(approximate, dict) else dict()
+
+def _z_score(confidence):
+    """Return the two sided normal quantile for a confidence level between 0 and 1."""
+    if not 0 < confidence < 1:
+        raise ValueError("confidence must be between 0 and 1")
+    from statistics import NormalDist
+    return NormalDist().inv_cdf(0.5 + confidence / 2)
+
+def _play_block(dice, plan, num_rolls, seed):
+    """Roll one block of a parallel play with its own generator seeded from seed."""
+    return _roll_plan(dice, plan, num_rolls, np.random.default_rng(seed))
+
+def _count_block(dice, plan, num_rolls, seed):
+    """Roll one block of a parallel play and return only its totals."""
+    return _kernels.chunk_totals(_play_block(dice, plan, num_rolls, seed), plan[0].size)
+
+def _map_blocks(func, dice, plan, num_rolls, seed, workers, block_size):
+    """Split num_rolls into blocks of block_size, each with a spawned child of SeedSequence(seed),
+    and yield func(dice, plan, block rolls, block seed) for every block in block order.
+    Blocks run in a process pool unless workers is 1.
+    """
+    if block_size < 1:
+        raise ValueError("block_size must be at least 1")
+    sizes = [min(block_size, num_rolls - start) for start in range(0, num_rolls, block_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    args = ([dice] * len(sizes), [plan] * len(sizes), sizes, seeds)
+    if workers == 1:
+        yield from map(func, *args)
+        return
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(func, *args)
+
+def _nbytes(value):
+    """Return roughly how many bytes value holds, for bounding the Analyzer cache."""
+    if isinstance(value, tuple):
+        return sum(_nbytes(item) for item in value)
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if hasattr(value, 'memory_usage'):
+        # DataFrames give a Series of per-column usage, Series and Index objects a number
+        return int(np.sum(value.memory_usage()))
+    return 64
+
+def _word_frame(keys, counts, faces, num_dice, dtype, words):
+    """Build the Count DataFrame for the distinct packed permutation keys that spell a word in words."""
+    found = words.isin(_kernels.unpack_rows(keys, faces.size, num_dice, dtype), faces)
+    return _count_frame(keys[found], counts[found], faces, num_dice, dtype)
+
+def _sparse_column(indices, values, length):
+    """Return a pandas SparseArray of length zeros except for values at indices."""
+    try:
+        # pandas has no public way to hand over the nonzero positions, so use its index class when
+        # it is there, and fall back to going through a dense column when a pandas version moves it
+        from pandas._libs.sparse import IntIndex
+        return pd.arrays.SparseArray(values, sparse_index=IntIndex(length, indices),
+                                     dtype=pd.SparseDtype(values.dtype, 0))
+    except (ImportError, TypeError):
+        column = np.zeros(length, dtype=values.dtype)
+        column[indices] = values
+        return pd.arrays.SparseArray(column, fill_value=0)
+
+def _count_frame(keys, counts, faces, num_dice, dtype, column='Count'):
+    """Build the Count DataFrame for distinct packed keys of codes, decoding the MultiIndex through faces.
+    column names the values column, for tables that hold something other than counts.
+    """
+    rows = _kernels.unpack_rows(keys, faces.size, num_dice, dtype)
+    order = _kernels.row_order(keys, rows)
+    if order is not None:
+        rows, counts = rows[order], counts[order]
+    # The codes already index into the faces, so they are the MultiIndex codes as they are;
+    # decoding every row through the faces first is slow with millions of distinct rows
+    index = pd.MultiIndex(levels=[faces] * num_dice, codes=list(rows.T), verify_integrity=False)
+    return pd.DataFrame({column: counts}, index=index)
+
+# Stages timed while a montecarlo.profiling.Stats object is collecting
+
+def _result_rows(args, kwargs, result):
+    return len(result)
+
+def _game_rows(args, kwargs, result):
+    return args[0]._num_rolls()
+
+def _analyzer_rows(args, kwargs, result):
+    return args[0].game._num_rolls()
+
+def _first_arg_rows(args, kwargs, result):
+    return len(args[0])
+
+_module = sys.modules[__name__]
+profiling.register(Die, 'roll_die', 'Die.roll_die', _result_rows)
+profiling.register(_module, '_roll_plan', 'sampling', _result_rows)
+profiling.register(Game, 'play', 'Game.play', _game_rows)
+profiling.register(Game, 'play_parallel', 'Game.play_parallel', _game_rows)
+profiling.register(Game, 'show_outcome', 'Game.show_outcome', _result_rows)
+profiling.register(Game, '_wide', 'DataFrame wide', _result_rows)
+profiling.register(Game, '_narrow', 'DataFrame narrow', _result_rows)
+for _method in ('jackpot', 'jackpot_detail', 'face_counts', 'face_counts_per_roll', 'combo_count', 'permutation_count', 'word_count'):
+    profiling.register(Analyzer, _method, f'Analyzer.{_method}', _analyzer_rows)
+profiling.register(StreamingAnalyzer, 'update', 'StreamingAnalyzer.update', _analyzer_rows)
+profiling.register(_kernels, 'pack_rows', 'packing keys', _first_arg_rows)
+profiling.register(_module, '_count_frame', 'DataFrame counts', _first_arg_rows)
@@ -0,0 +1,219 @@
+import numpy as np
+import pandas as pd
+from montecarlo import _kernels, simulator
+
+_MIX1 = np.uint64(0xbf58476d1ce4e5b9)
+_MIX2 = np.uint64(0x94d049bb133111eb)
+_GOLDEN = 0x9e3779b97f4a7c15
+
+def _mix(values):
+    """Scramble uint64 values with the splitmix64 finalizer."""
+    values = (values ^ (values >> np.uint64(30))) * _MIX1
+    values = (values ^ (values >> np.uint64(27))) * _MIX2
+    return values ^ (values >> np.uint64(31))
+
+def _hash_keys(keys, salt=0):
+    """Return a uint64 hash of each packed row key from _kernels.pack_rows, uint64 or void."""
+    salt = np.uint64(salt * _GOLDEN % 2**64)
+    if keys.dtype == np.uint64:
+        return _mix(keys ^ salt)
+    # Hash the raw bytes of each void key eight at a time
+    raw = np.frombuffer(keys.tobytes(), dtype=np.uint8).reshape(keys.size, keys.dtype.itemsize)
+    raw = np.pad(raw, ((0, 0), (0, -raw.shape[1] % 8)))
+    hashes = np.full(keys.size, salt, dtype=np.uint64)
+    for word in np.ascontiguousarray(raw).view(np.uint64).T:
+        hashes = _mix(hashes ^ word)
+    return hashes
+
+def _leading_zeros(values):
+    """Return the number of leading zero bits of each uint64 value, by binary search over the bit width."""
+    values = values.copy()
+    zeros = np.zeros(values.size, dtype=np.uint8)
+    for shift in (32, 16, 8, 4, 2, 1):
+        empty = (values >> np.uint64(64 - shift)) == 0
+        zeros[empty] += shift
+        values[empty] <<= np.uint64(shift)
+    return zeros
+
+# Count-Min Sketch Class
+
+class CountMinSketch:
+    """
+    A class estimating how many times each key was added, in a fixed depth by width table of counters.
+    Estimates never undercount; with probability 1 - exp(-depth) they overcount by at most
+    e / width times the total added.
+    """
+
+    def __init__(self, width=2**16, depth=4):
+        """Initialization method, width counters in each of depth independently hashed rows."""
+        self.width = width
+        self.depth = depth
+        self.total = 0
+        self._table = np.zeros((depth, width), dtype=np.int64)
+
+    def _columns(self, keys):
+        """Return the (depth, keys) matrix of the counter each key hits in each row."""
+        return np.array([_hash_keys(keys, row + 1) % np.uint64(self.width) for row in range(self.depth)],
+                        dtype=np.intp).reshape(self.depth, keys.size)
+
+    def add(self, keys, counts):
+        """Add counts to the distinct packed keys."""
+        for row, columns in zip(self._table, self._columns(keys)):
+            row += np.bincount(columns, weights=counts, minlength=self.width).astype(np.int64)
+        self.total += int(np.sum(counts))
+
+    def query(self, keys):
+        """Return the estimated count of each packed key."""
+        columns = self._columns(keys)
+        return self._table[np.arange(self.depth)[:, None], columns].min(axis=0)
+
+    def error(self):
+        """Return the most an estimate overcounts by, with probability 1 - exp(-depth)."""
+        return np.e / self.width * self.total
+
+# HyperLogLog Class
+
+class HyperLogLog:
+    """
+    A class estimating how many distinct keys were added, in 2 ** precision one byte registers.
+    The standard error of the estimate is about 1.04 / sqrt(2 ** precision).
+    """
+
+    def __init__(self, precision=14):
+        """Initialization method, precision between 4 and 18 sets the number of registers."""
+        if not 4 <= precision <= 18:
+            raise ValueError("precision must be between 4 and 18")
+        self.precision = precision
+        self._registers = np.zeros(2 ** precision, dtype=np.uint8)
+
+    def add(self, keys):
+        """Add packed keys."""
+        hashes = _hash_keys(keys)
+        buckets = (hashes >> np.uint64(64 - self.precision)).astype(np.intp)
+        # The low bit set caps the rank for hashes whose remaining bits are all zero
+        rest = (hashes << np.uint64(self.precision)) | np.uint64(1 << (self.precision - 1))
+        np.maximum.at(self._registers, buckets, _leading_zeros(rest) + 1)
+
+    def estimate(self):
+        """Return the estimated number of distinct keys added."""
+        m = self._registers.size
+        estimate = 0.7213 / (1 + 1.079 / m) * m * m / np.sum(2.0 ** -self._registers.astype(float))
+        empty = np.count_nonzero(self._registers == 0)
+        if estimate <= 2.5 * m and empty:
+            # Linear counting is more accurate while many registers are still empty
+            estimate = m * np.log(m / empty)
+        return int(round(estimate))
+
+# Outcome Sketch Class
+
+class OutcomeSketch:
+    """
+    A class approximately counting the combinations or permutations of a dice game in bounded memory.
+    Rows are packed into keys as for the exact counts, then a Count-Min sketch estimates the count of
+    any outcome, a HyperLogLog estimates the number of distinct outcomes, and a Space-Saving summary
+    keeps the most frequent outcomes as heavy hitters.  Each heavy hitter holds the exact count added
+    since it was last taken in plus a bound on what it could have had before; its estimate is the
+    smaller of that and the Count-Min estimate, so it never undercounts.
+    """
+
+    def __init__(self, width=2**16, depth=4, top=100, precision=14, combinations=False):
+        """
+        Initialization method.  width and depth size the Count-Min sketch, top is how many of the most
+        frequent outcomes to keep and precision sizes the HyperLogLog.  Set combinations to True to
+        count combinations (rows sorted, so order doesn't matter) rather than permutations.
+        """
+        self.top = top
+        self.combinations = combinations
+        self.counts = CountMinSketch(width, depth)
+        self.distinct_keys = HyperLogLog(precision)
+        self._candidates = self._seen = self._missed = None
+        #the most any outcome that isn't a candidate can have been counted
+        self._floor = 0
+        self._faces = None
+
+    def _bind(self, faces, num_dice, dtype):
+        """Fix the faces, number of dice and code dtype the packed keys refer to, on the first rows added."""
+        if self._faces is None:
+            self._faces, self._num_dice, self._dtype = faces, num_dice, dtype
+            self._candidates = _kernels.pack_rows(np.empty((0, num_dice), dtype=dtype), faces.size)
+            self._seen = self._missed = np.zeros(0, dtype=np.int64)
+        elif not np.array_equal(faces, self._faces) or num_dice != self._num_dice:
+            raise ValueError("The sketch already holds outcomes of a game with other faces or dice")
+
+    def update(self, codes, faces):
+        """Add rows of codes into faces, one outcome per row."""
+        self._bind(faces, codes.shape[1], codes.dtype)
+        self.add(*_kernels.count_rows(codes, faces.size, self.combinations))
+
+    def add(self, keys, counts):
+        """Add counts to distinct packed keys made by _kernels.pack_rows over the bound faces."""
+        self.counts.add(keys, counts)
+        self.distinct_keys.add(keys)
+        # Candidates add the exact counts of this batch; a newcomer may have been counted up to
+        # the floor before it was taken in
+        candidates, inverse = np.unique(np.concatenate([self._candidates, keys]), return_inverse=True)
+        inverse = inverse.ravel()
+        seen = np.zeros(candidates.size, dtype=np.int64)
+        np.add.at(seen, inverse, np.concatenate([self._seen, np.asarray(counts, dtype=np.int64)]))
+        missed = np.full(candidates.size, self._floor, dtype=np.int64)
+        missed[inverse[:self._candidates.size]] = self._missed
+        # Keep a few times top candidates, leaving room for outcomes whose counts are still catching up;
+        # the floor rises to the largest estimate dropped
+        if candidates.size > 4 * self.top:
+            estimates = self._estimates(candidates, seen, missed)
+            order = np.argpartition(-estimates, 4 * self.top)
+            self._floor = max(self._floor, int(estimates[order[4 * self.top:]].max()))
+            keep = np.sort(order[:4 * self.top])
+            candidates, seen, missed = candidates[keep], seen[keep], missed[keep]
+        self._candidates, self._seen, self._missed = candidates, seen, missed
+    
+    def _estimates(self, keys, seen, missed):
+        """Return the estimated counts of candidate keys, the smaller of their two upper bounds."""
+        return np.minimum(seen + missed, self.counts.query(keys))
+
+
+    def _check_added(self):
+        """Throws error if no outcomes have been added yet, so there are no faces to look up."""
+        if self._faces is None:
+            raise ValueError("No outcomes added yet")
+    
+    def distinct(self):
+        """Return the estimated number of distinct outcomes."""
+        return self.distinct_keys.estimate()
+
+    def count(self, outcomes):
+        """Return a Series of the estimated count of each outcome, a tuple of faces (one per die)."""
+        self._check_added()
+        position = {face: i for i, face in enumerate(self._faces.tolist())}
+        try:
+            codes = np.array([[position[face] for face in outcome] for outcome in outcomes], dtype=self._dtype)
+        except KeyError as e:
+            raise ValueError(f"{e.args[0]} is not a face of the game")
+        if codes.shape[1:] != (self._num_dice,):
+            raise ValueError(f"An outcome needs one face per die ({self._num_dice})")
+        if self.combinations:
+            codes = np.sort(codes, axis=1)
+        keys = _kernels.pack_rows(codes, self._faces.size)
+        # Outcomes that aren't candidates were counted at most floor times
+        estimates = np.minimum(self.counts.query(keys), self._floor)
+        position = np.searchsorted(self._candidates, keys).clip(0, max(self._candidates.size - 1, 0))
+        found = (self._candidates[position] == keys) if self._candidates.size else np.zeros(keys.size, dtype=bool)
+        estimates[found] = self._estimates(keys[found], self._seen[position[found]], self._missed[position[found]])
+        return pd.Series(estimates, index=pd.MultiIndex.from_tuples([tuple(o) for o in outcomes]), name='Count')
+
+    def count_frame(self):
+        """
+        Return the top most frequent outcomes and their estimated counts, in the format of
+        Analyzer.combo_count or permutation_count but ordered by count, most frequent first.
+        attrs holds the estimated number of distinct outcomes as 'distinct' and the most any of the
+        counts can overestimate by, the largest part of an estimate not seen exactly, as 'error'.
+        """
+        self._check_added()
+        keys = self._candidates
+        estimates = self._estimates(keys, self._seen, self._missed)
+        keep = np.sort(np.argsort(-estimates, kind='stable')[:self.top])
+        frame = simulator._count_frame(keys[keep], estimates[keep], self._faces, self._num_dice, self._dtype)
+        frame = frame.sort_values('Count', ascending=False, kind='stable')
+        error = int((estimates[keep] - self._seen[keep]).max()) if keep.size else 0
+        frame.attrs.update({'distinct': self.distinct(), 'error': error})
+        return frame
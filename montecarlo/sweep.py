@@ -0,0 +1,163 @@
+import os
+import json
+import hashlib
+import time
+import itertools
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from montecarlo.simulator import Game, StreamingAnalyzer
+
+def summarize(streaming):
+    """Default per-configuration summary of a finished StreamingAnalyzer, as a dict of plain numbers."""
+    combos = streaming.combo_count()
+    return {'jackpots': streaming.jackpot(),
+            'jackpot_rate': streaming.jackpot() / streaming.num_rolls,
+            'distinct_combos': len(combos),
+            'distinct_permutations': len(streaming.permutation_count()),
+            'top_combo': ' '.join(map(str, combos['Count'].idxmax())),
+            'top_combo_rate': int(combos['Count'].max()) / streaming.num_rolls}
+
+# Sweep Class
+
+class Sweep:
+    """
+    A class running a grid of game configurations (which die, how many of them, how many rolls)
+    across a pool of worker processes and collecting one summary row per configuration.
+    Finished configurations are appended to an optional checkpoint file so an interrupted
+    sweep picks up where it stopped.
+    """
+
+    def __init__(self, dice, num_dice, num_rolls, seed=None, summary=summarize, checkpoint=None):
+        """
+        Initialization method.  dice is a dict of name to Die; every configuration plays a game of
+        identical copies of one of them, so dice with the same weights share one sampling table.
+        num_dice and num_rolls are lists of values to sweep.  Each configuration is seeded with its
+        own child of seed, so results don't depend on scheduling.  summary turns a finished
+        StreamingAnalyzer into a dict and must be a module level function when using workers.
+        checkpoint is the path of a JSON lines file of finished configurations.  Its first line records
+        the seed and the dice weights, and resuming with a different seed or dice raises a ValueError.
+        Without a seed, a resumed sweep carries on with the seed recorded in the checkpoint.
+        Throws error if a number of rolls is less than 1.
+        """
+        if any(rolls < 1 for rolls in num_rolls):
+            raise ValueError("Every number of rolls must be at least 1")
+        self.dice = dice
+        self.seed = seed
+        self.summary = summary
+        self.checkpoint = checkpoint
+        self._configs = [{'dice': name, 'num_dice': n, 'num_rolls': rolls}
+                         for name, n, rolls in itertools.product(dice, num_dice, num_rolls)]
+        self._entropy = np.random.SeedSequence(seed).entropy
+
+    def configs(self):
+        """Return the grid of configurations as a DataFrame."""
+        return pd.DataFrame(self._configs)
+
+    def run(self, workers=None, chunk_size=1000000):
+        """Run every configuration not already in the checkpoint and return the tidy result table,
+        one row per configuration with its settings followed by its summary.
+        workers defaults to the number of CPUs; 1 runs in this process.
+        """
+        done = self._load_checkpoint()
+        todo = [i for i, config in enumerate(self._configs) if _key(config) not in done]
+        for index, record in self._results(todo, workers, chunk_size):
+            done[_key(self._configs[index])] = record
+            self._save(record)
+        return pd.DataFrame([done[_key(config)] for config in self._configs if _key(config) in done])
+
+    def _results(self, todo, workers, chunk_size):
+        """Yield (configuration number, result row) for each configuration in todo as it finishes."""
+        tasks = [(self.dice[self._configs[i]['dice']], self._configs[i], self._seed(i), chunk_size, self.summary)
+                 for i in todo]
+        if workers == 1:
+            for i, task in zip(todo, tasks):
+                yield i, _run_config(*task)
+            return
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(_run_config, *task): i for i, task in zip(todo, tasks)}
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+
+    def _fingerprint(self):
+        """Return what a checkpoint must match to be resumed: the seed entropy and a hash of each die."""
+        dice = dict()
+        for name, die in self.dice.items():
+            content = json.dumps([die._faces.tolist(), die._weights.tolist()]).encode()
+            dice[str(name)] = hashlib.blake2b(content, digest_size=16).hexdigest()
+        return {'entropy': self._entropy, 'dice': dice}
+
+    def _seed(self, index):
+        """Return the seed of configuration number index, a child of the sweep's seed."""
+        return np.random.SeedSequence(self._entropy, spawn_key=(index,))
+
+    def _load_checkpoint(self):
+        """Return the finished result rows in the checkpoint file, keyed by configuration.
+        A line cut short by an interruption is dropped from the file, so later rows append cleanly.
+        """
+        done = dict()
+        if self.checkpoint is None or not os.path.exists(self.checkpoint):
+            return done
+        with open(self.checkpoint) as f:
+            lines = f.readlines()
+        complete = []
+        for line in lines:
+            try:
+                record = json.loads(line) if line.endswith('\n') else None
+            except json.JSONDecodeError:
+                record = None
+            if record is None:
+                #the configuration of a cut short line is simply run again
+                continue
+            complete.append(line)
+            if 'sweep' in record:
+                if self.seed is None:
+                    #an unseeded sweep draws fresh entropy, so it resumes with the checkpoint's
+                    self._entropy = record['sweep']['entropy']
+                if record['sweep'] != self._fingerprint():
+                    raise ValueError(f"{self.checkpoint} was written by a sweep with another seed or other dice")
+                continue
+            if len(complete) == 1:
+                raise ValueError(f"{self.checkpoint} doesn't start with the seed and dice of its sweep")
+            done[_key(record)] = record
+        if len(complete) != len(lines):
+            self._rewrite(complete)
+        return done
+
+    def _rewrite(self, lines):
+        """Replace the checkpoint file with lines, through a temporary file so it is never half written."""
+        temporary = self.checkpoint + '.tmp'
+        with open(temporary, 'w') as f:
+            f.writelines(lines)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, self.checkpoint)
+
+    def _save(self, record):
+        """Append one finished result row to the checkpoint file."""
+        if self.checkpoint is None:
+            return
+        with open(self.checkpoint, 'a') as f:
+            if not f.tell():
+                f.write(json.dumps({'sweep': self._fingerprint()}) + '\n')
+            f.write(json.dumps(record) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+def _key(config):
+    """Return the identity of a configuration (or a result row holding one)."""
+    return (config['dice'], config['num_dice'], config['num_rolls'])
+
+def _run_config(die, config, seed, chunk_size, summary):
+    """Play one configuration and return its result row."""
+    start = time.perf_counter()
+    game = Game([die] * config['num_dice'])
+    streaming = StreamingAnalyzer(game).run(config['num_rolls'], chunk_size, seed=seed)
+    record = dict(config)
+    record.update({name: _plain(value) for name, value in summary(streaming).items()})
+    record['seconds'] = time.perf_counter() - start
+    return record
+
+def _plain(value):
+    """Turn NumPy scalars into plain Python numbers so the row can be written as JSON."""
+    return value.item() if isinstance(value, np.generic) else value
@@ -0,0 +1,86 @@
+import os
+import numpy as np
+
+#Words longer than this are kept as byte strings instead of packed integer keys
+_MAX_PACKED = 12
+
+#Word lists already read, keyed by file path and modification time
+_loaded = dict()
+
+# Word List Class
+
+class WordList:
+    """
+    A class holding a list of words as sorted packed integer keys, one array per word length,
+    for matching the permutations rolled by letter dice against a dictionary.
+    Letters are case-insensitive and words with anything other than A-Z are skipped.
+    """
+    
+    def __init__(self, words):
+        """Initialization method, takes an iterable of words."""
+        words = np.array([word.upper() for word in words if word.isascii() and word.isalpha()], dtype=bytes)
+        self._keys = dict()
+        if words.size == 0:
+            return
+        lengths = np.char.str_len(words)
+        letters = words.view(np.uint8).reshape(words.size, -1)
+        for length in np.unique(lengths):
+            rows = letters[lengths == length, :length] - np.uint8(ord('A') - 1)
+            self._keys[int(length)] = np.unique(_pack_letters(rows))
+    
+    @classmethod
+    def from_file(cls, path):
+        """Read a word list with one word per line.  Each file is only read once per process
+        unless it changes; .npz files written by save are loaded directly.
+        """
+        key = (os.path.abspath(path), os.path.getmtime(path))
+        if key not in _loaded:
+            if path.endswith('.npz'):
+                words = cls([])
+                with np.load(path) as saved:
+                    words._keys = {int(name): saved[name] for name in saved.files}
+            else:
+                with open(path) as f:
+                    words = cls(f.read().split())
+            _loaded[key] = words
+        return _loaded[key]
+    
+    def save(self, path):
+        """Save the packed keys to an .npz file that from_file loads without parsing any words."""
+        np.savez(path, **{str(length): keys for length, keys in self._keys.items()})
+        
+    def __len__(self):
+        """Return the number of words in the list."""
+        return sum(keys.size for keys in self._keys.values())
+    
+    def isin(self, rows, faces):
+        """Return a boolean array flagging which rows of face codes spell a word, reading each row
+        through the faces vocabulary.  Faces that aren't single letters never match.
+        """
+        letters = np.array([_letter(face) for face in faces.tolist()], dtype=np.uint8)
+        if rows.shape[1] not in self._keys:
+            return np.zeros(rows.shape[0], dtype=bool)
+        rows = letters[rows]
+        keys = self._keys[rows.shape[1]]
+        queries = _pack_letters(rows)
+        # Binary search for each row's key in the sorted keys of that length
+        found = np.searchsorted(keys, queries).clip(max=keys.size - 1)
+        return (keys[found] == queries) & (rows > 0).all(axis=1)
+
+def _letter(face):
+    """Return the position in the alphabet (1 to 26) of a single letter face, otherwise 0."""
+    if isinstance(face, str) and len(face) == 1 and face.isascii() and face.isalpha():
+        return ord(face.upper()) - ord('A') + 1
+    return 0
+
+def _pack_letters(rows):
+    """Pack rows of alphabet positions into one key per row: five bits per letter in a uint64,
+    or the letters as byte strings for words longer than _MAX_PACKED.
+    """
+    if rows.shape[1] > _MAX_PACKED:
+        rows = np.ascontiguousarray(rows, dtype=np.uint8)
+        return rows.view(f'S{rows.shape[1]}').ravel()
+    keys = np.zeros(rows.shape[0], dtype=np.uint64)
+    for j in range(rows.shape[1]):
+        keys = (keys << np.uint64(5)) | rows[:, j]
+    return keys
@@ -1,9 +1,16 @@
+import os
+import sys
+import subprocess
+import tempfile
 import unittest
 import numpy as np
 import pandas as pd
+from collections import Counter
 from montecarlo.simulator import Die
 from montecarlo.simulator import Game
 from montecarlo.simulator import Analyzer
+from montecarlo.simulator import StreamingAnalyzer
+from montecarlo.simulator import _roll_plan
 
 class TestSimulator(unittest.TestCase):
     """Unit tests for the project"""
@@ -137,6 +144,439 @@ class TestSimulator(unittest.TestCase):
         self.assertIsInstance(permutation_df, pd.DataFrame)
         self.assertIsInstance(permutation_df.index, pd.MultiIndex)
 
+    def test_13_die_roll_die_array(self):
+        """Test rolling a die with NumPy array output"""
+        faces = np.array(['A', 'B', 'C', 'D', 'E', 'F'])
+        die13 = Die(faces)
+        
+        #roll the die 100 times and check that the result is an array of valid faces
+        results = die13.roll_die(100, as_array=True)
+        self.assertIsInstance(results, np.ndarray)
+        self.assertEqual(len(results), 100)
+        self.assertTrue(np.isin(results, faces).all())
+    
+    def test_14_die_change_weight_resamples(self):
+        """Test that changed weights are used by the next roll"""
+        faces = np.array(['A', 'B', 'C'])
+        die14 = Die(faces)
+        die14.roll_die(10)
+        
+        #zero out every face but 'C' and make sure only 'C' is rolled
+        die14.change_weight('A', 0)
+        die14.change_weight('B', 0)
+        self.assertEqual(set(die14.roll_die(50)), {'C'})
+
+    def test_15_game_play_mixed_dice(self):
+        """Test playing a game with dice of different faces and weights"""
+        letters = Die(np.array(['A', 'B', 'C']))
+        loaded = Die(np.array(['A', 'B', 'C']))
+        loaded.change_weight('A', 0)
+        loaded.change_weight('B', 0)
+        numbers = Die(np.array([1, 2]))
+        game9 = Game([letters, loaded, numbers])
+        game9.play(50)
+        
+        #each column should only hold faces from its own die
+        outcome = game9.show_outcome()
+        self.assertEqual(outcome.shape, (50, 3))
+        self.assertTrue(outcome[0].isin(['A', 'B', 'C']).all())
+        self.assertTrue((outcome[1] == 'C').all())
+        self.assertTrue(outcome[2].isin([1, 2]).all())
+
+    def test_16_game_encoded_outcome(self):
+        """Test that outcomes are stored as compact codes and shown as categorical columns"""
+        faces = np.array(['A', 'B', 'C', 'D', 'E', 'F'])
+        game10 = Game([Die(faces), Die(faces)])
+        game10.play(20)
+        
+        #codes should fit in one byte and decode back to the wide view
+        codes, vocab = game10._encoded()
+        self.assertEqual(codes.dtype, np.uint8)
+        self.assertEqual(list(vocab), list(faces))
+        outcome = game10.show_outcome("wide")
+        self.assertIsInstance(outcome[0].dtype, pd.CategoricalDtype)
+        self.assertTrue((outcome.apply(lambda col: col.cat.codes).to_numpy() == codes).all())
+
+    def test_17_analyzer_jackpot_detail(self):
+        """Test the jackpot rolls and face distribution"""
+        faces = np.array(['A', 'B'])
+        loaded = Die(faces)
+        loaded.change_weight('A', 0)
+        game11 = Game([loaded, loaded, loaded])
+        game11.play(10)
+        analyzer6 = Analyzer(game11)
+        
+        #every roll is all 'B' so every roll is a jackpot on 'B'
+        rolls, face_dist = analyzer6.jackpot_detail()
+        self.assertEqual(analyzer6.jackpot(), 10)
+        self.assertEqual(list(rolls), list(range(10)))
+        self.assertEqual(face_dist['B'], 10)
+        self.assertEqual(face_dist['A'], 0)
+
+    def test_18_analyzer_face_counts_sparse(self):
+        """Test that face counts use every face in order and that the sparse output matches"""
+        faces = np.array(['C', 'A', 'B', 'D'])
+        game12 = Game([Die(faces), Die(faces), Die(faces)])
+        game12.play(25)
+        analyzer7 = Analyzer(game12)
+        
+        #columns are every face in sorted order and every roll counts all three dice
+        dense = analyzer7.face_counts_per_roll()
+        self.assertEqual(list(dense.columns), ['A', 'B', 'C', 'D'])
+        self.assertTrue((dense.sum(axis=1) == 3).all())
+        sparse = analyzer7.face_counts_per_roll(sparse=True)
+        self.assertTrue((sparse.sparse.to_dense().to_numpy() == dense.to_numpy()).all())
+
+    def test_19_analyzer_counts_match_rolls(self):
+        """Test that combo and permutation counts agree with counting the rolls directly"""
+        faces = np.array(['A', 'B', 'C'])
+        game13 = Game([Die(faces), Die(faces)])
+        game13.play(200)
+        analyzer8 = Analyzer(game13)
+        rolls = [tuple(row) for row in game13.show_outcome().to_numpy().tolist()]
+        
+        #compare against a plain count of the rolled tuples
+        perms = analyzer8.permutation_count()
+        combos = analyzer8.combo_count()
+        self.assertEqual(dict(zip(perms.index, perms['Count'])), dict(Counter(rolls)))
+        self.assertEqual(dict(zip(combos.index, combos['Count'])),
+                         dict(Counter(tuple(sorted(roll)) for roll in rolls)))
+        
+        #faces with more dice than fit in a 64 bit key still count every roll
+        game14 = Game([Die(np.arange(300))] * 9)
+        game14.play(50)
+        self.assertEqual(Analyzer(game14).permutation_count()['Count'].sum(), 50)
+
+    def test_20_streaming_analyzer(self):
+        """Test that chunked play accumulates the same statistics as the rolls it produced"""
+        faces = np.array(['A', 'B', 'C'])
+        game15 = Game([Die(faces), Die(faces)])
+        streaming = StreamingAnalyzer(game15)
+        rolls = []
+        for size in game15.play_chunks(95, chunk_size=20):
+            streaming.update()
+            rolls.extend(tuple(row) for row in game15.show_outcome().to_numpy().tolist())
+        
+        #the last chunk holds only the remaining rolls, numbered from its place in the run
+        self.assertEqual(size, 15)
+        self.assertEqual(list(game15.show_outcome().index), list(range(80, 95)))
+        
+        #the totals should match counting all the chunks together
+        self.assertEqual(streaming.num_rolls, 95)
+        self.assertEqual(streaming.jackpot(), sum(len(set(roll)) == 1 for roll in rolls))
+        self.assertEqual(streaming.face_counts()['A'], sum(roll.count('A') for roll in rolls))
+        perms = streaming.permutation_count()
+        self.assertEqual(dict(zip(perms.index, perms['Count'])), dict(Counter(rolls)))
+        self.assertEqual(streaming.combo_count()['Count'].sum(), 95)
+
+    def test_21_parallel_play_reproducible(self):
+        """Test that a seeded parallel play gives the same outcome for any number of workers"""
+        faces = np.array(['A', 'B', 'C', 'D', 'E', 'F'])
+        game16 = Game([Die(faces), Die(faces), Die(faces)])
+        
+        #one worker in process against a pool of two
+        game16.play_parallel(1000, seed=5, workers=1, block_size=300)
+        serial = game16.show_outcome().copy()
+        game16.play_parallel(1000, seed=5, workers=2, block_size=300)
+        self.assertTrue(serial.equals(game16.show_outcome()))
+        
+        #the streaming totals should agree the same way
+        totals1 = StreamingAnalyzer(game16).run_parallel(1000, seed=5, workers=1, block_size=300)
+        totals2 = StreamingAnalyzer(game16).run_parallel(1000, seed=5, workers=2, block_size=300)
+        self.assertEqual(totals1.jackpot(), totals2.jackpot())
+        self.assertTrue(totals1.permutation_count().equals(totals2.permutation_count()))
+
+    def test_22_seeded_play_and_skip_ahead(self):
+        """Test that seeds make rolls reproducible and start_roll resumes a seeded run"""
+        faces = np.array(['A', 'B', 'C', 'D', 'E', 'F'])
+        self.assertEqual(Die(faces, seed=3).roll_die(20), Die(faces, seed=3).roll_die(20))
+        self.assertEqual(Die(faces).roll_die(20, seed=4), Die(faces).roll_die(20, seed=4))
+        
+        #the second half of a seeded run can be played on its own
+        game17 = Game([Die(faces), Die(faces)])
+        game17.play(100, seed=11)
+        full = game17.show_outcome().copy()
+        game17.play(40, seed=11, start_roll=60)
+        self.assertTrue(full.iloc[60:].equals(game17.show_outcome()))
+        
+        #start_roll only makes sense for a seeded run
+        with self.assertRaises(ValueError):
+            game17.play(10, start_roll=5)
+
+    def test_23_game_save_load(self):
+        """Test saving a game and analyzing the memory-mapped reload"""
+        faces = np.array(['A', 'B', 'C'])
+        loaded_die = Die(faces)
+        loaded_die.change_weight('A', 4)
+        game18 = Game([loaded_die, Die(faces)])
+        game18.play(200)
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'run')
+            game18.save(path)
+            game19 = Game.load(path)
+            
+            #the outcome, dice and statistics should all come back unchanged
+            self.assertIsInstance(game19._codes, np.memmap)
+            self.assertTrue(game19.show_outcome().equals(game18.show_outcome()))
+            self.assertEqual(game19.dice[0].show_die().loc['A', 'Weight'], 4.0)
+            self.assertEqual(Analyzer(game19).jackpot(), Analyzer(game18).jackpot())
+            scanned = StreamingAnalyzer(game19).scan(chunk_size=64)
+            self.assertTrue(scanned.permutation_count().equals(Analyzer(game18).permutation_count()))
+            del game19, scanned
+
+    def test_24_analyzer_cache(self):
+        """Test that analyzer results are cached until the game is played again"""
+        faces = np.array(['A', 'B', 'C'])
+        game20 = Game([Die(faces), Die(faces)])
+        game20.play(100)
+        analyzer9 = Analyzer(game20)
+        
+        #repeated calls reuse the cached result but hand back a fresh copy
+        first = analyzer9.permutation_count()
+        first['Count'] = 0
+        self.assertEqual(analyzer9.permutation_count()['Count'].sum(), 100)
+        self.assertIn('perm_counts', analyzer9._cache)
+        
+        #playing again bumps the game's version and drops the stale results
+        game20.play(30)
+        self.assertEqual(analyzer9.permutation_count()['Count'].sum(), 30)
+        self.assertEqual(len(analyzer9.face_counts_per_roll()), 30)
+        
+        #nothing is kept once the cache has no room
+        analyzer10 = Analyzer(game20, max_cache_bytes=0)
+        analyzer10.combo_count()
+        self.assertEqual(len(analyzer10._cache), 0)
+
+    def test_25_game_narrow_chunks(self):
+        """Test the narrow view against stacking the wide view and in chunks"""
+        faces = np.array(['A', 'B', 'C'])
+        game21 = Game([Die(faces), Die(faces), Die(faces)])
+        game21.play(40)
+        narrow = game21.show_outcome("narrow")
+        
+        #same rolls, dice and outcomes as stacking the wide view
+        stacked = game21.show_outcome("wide").stack()
+        self.assertEqual(list(narrow.index.names), ['Roll Number', 'Die Number'])
+        self.assertEqual(list(narrow.index), list(stacked.index))
+        self.assertEqual(list(narrow['Outcome']), list(stacked))
+        
+        #the chunks put back together match the full narrow view
+        chunks = list(game21.narrow_chunks(chunk_size=15))
+        self.assertEqual(len(chunks), 3)
+        self.assertTrue(pd.concat(chunks).equals(narrow))
 
+    def test_26_shared_sampling_tables(self):
+        """Test that dice with the same weights share one sampling table"""
+        faces = np.array(['A', 'B', 'C'])
+        die15, die16, die17 = Die(faces), Die(faces), Die(faces)
+        die16.change_weight('A', 2)
+        die17.change_weight('A', 2)
+        game22 = Game([die15, die16, die17, Die(faces)])
+        
+        #one group of faces with two distinct tables, used in order 0, 1, 1, 0
+        (cols, lut, tables, which), = game22._plan()[2]
+        self.assertEqual(len(tables), 2)
+        self.assertEqual(list(which), [0, 1, 1, 0])
+        self.assertIs(die16._table(), die17._table())
+        
+        #changing a weight gives the die its own table again
+        die17.change_weight('B', 5)
+        self.assertIsNot(die16._table(), die17._table())
+        self.assertAlmostEqual(die17._table().probs[1], 5 / 8)
+
+    def test_27_die_bulk_weights(self):
+        """Test building a die from weights and changing many weights at once"""
+        faces = np.array(['A', 'B', 'C', 'D'])
+        die18 = Die(faces, weights=np.array([1, 2, 3, 4]))
+        self.assertEqual(list(die18.show_die()['Weight']), [1.0, 2.0, 3.0, 4.0])
+        
+        die18.change_weights(['D', 'A'], [0, 6])
+        self.assertEqual(list(die18.show_die()['Weight']), [6.0, 2.0, 3.0, 0.0])
+        self.assertAlmostEqual(die18._table().probs[0], 6 / 11)
+        
+        #a bad face or weight leaves the die unchanged
+        with self.assertRaises(IndexError):
+            die18.change_weights(['A', 'X'], [1, 1])
+        with self.assertRaises(TypeError):
+            die18.change_weights(['A', 'B'], [1, 'heavy'])
+        self.assertEqual(die18.show_die().loc['A', 'Weight'], 6.0)
+        
+        #a two column file of faces and weights
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'letters.txt')
+            with open(path, 'w') as f:
+                f.write("E 12\nT 9\nQ 1\n")
+            die19 = Die.from_file(path)
+        self.assertEqual(list(die19.show_die().index), ['E', 'T', 'Q'])
+        self.assertEqual(die19.show_die().loc['T', 'Weight'], 9.0)
+
+
+    def test_28_run_until_tolerance(self):
+        """Test that an adaptive run stops once the confidence interval is narrow enough"""
+        faces = np.array(['A', 'B', 'C'])
+        game23 = Game([Die(faces), Die(faces), Die(faces)])
+        stream_test7 = StreamingAnalyzer(game23)
+        result = stream_test7.run_until(0.01, seed=5)
+        self.assertLessEqual(result['Half Width'], 0.01)
+        self.assertLess(result['Lower'], 1 / 9)
+        self.assertGreater(result['Upper'], 1 / 9)
+        self.assertEqual(result['Rolls'], stream_test7.num_rolls)
+        
+        #the adaptive batches give the same rolls as one seeded play
+        game23.play(stream_test7.num_rolls, seed=5)
+        self.assertEqual(Analyzer(game23).jackpot(), stream_test7.jackpot())
+        
+        #a combination rate, and a warning when max_rolls comes first
+        combo = StreamingAnalyzer(game23).run_until(0.02, target=('B', 'A', 'A'), seed=6)
+        self.assertLessEqual(combo['Half Width'], 0.02)
+        with self.assertWarns(UserWarning):
+            capped = StreamingAnalyzer(game23).run_until(0.0001, max_rolls=2000, seed=6)
+        self.assertEqual(capped['Rolls'], 2000)
+        with self.assertRaises(ValueError):
+            stream_test7.interval(target=('A', 'A', 'X'))
+        with self.assertRaises(ValueError):
+            StreamingAnalyzer(game23).run_until(0.01, min_rolls=0, seed=6)
+        with self.assertRaises(ValueError):
+            StreamingAnalyzer(game23).run_until(0.01, max_rolls=0, seed=6)
+        
+    def test_29_aggregate_play(self):
+        """Test that an aggregate play keeps only totals that the Analyzer reads directly"""
+        faces = np.array(['A', 'B', 'C', 'D'])
+        game24 = Game([Die(faces), Die(faces), Die(faces)])
+        game24.play(5000, seed=8)
+        analyzer_test9 = Analyzer(game24)
+        jackpots, face_counts = analyzer_test9.jackpot(), analyzer_test9.face_counts()
+        combos, perms = analyzer_test9.combo_count(), analyzer_test9.permutation_count()
+        
+        game24.play(5000, seed=8, aggregate=True, chunk_size=700)
+        self.assertIsNone(game24._codes)
+        analyzer_test10 = Analyzer(game24)
+        self.assertEqual(analyzer_test10.jackpot(), jackpots)
+        self.assertTrue(analyzer_test10.face_counts().equals(face_counts))
+        self.assertTrue(analyzer_test10.combo_count().equals(combos))
+        self.assertTrue(analyzer_test10.permutation_count().equals(perms))
+        
+        #per-roll results aren't kept
+        with self.assertRaises(ValueError):
+            game24.show_outcome()
+        with self.assertRaises(ValueError):
+            analyzer_test10.face_counts_per_roll()
+        
+    def test_30_rolls_without_pandas(self):
+        """Test that rolling dice and playing a game don't import pandas until a DataFrame is asked for"""
+        script = (
+            "import sys, numpy as np\n"
+            "import montecarlo.simulator as s\n"
+            "die = s.Die(np.array(['A', 'B', 'C']))\n"
+            "die.change_weight('A', 4)\n"
+            "game = s.Game([die, die])\n"
+            "game.play(100)\n"
+            "print('pandas' in sys.modules, s.Analyzer(game).jackpot() >= 0, 'pandas' in sys.modules)\n"
+            "die.show_die()\n"
+            "print('pandas' in sys.modules)\n")
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        output = subprocess.run([sys.executable, '-c', script], cwd=root, capture_output=True, text=True, check=True)
+        self.assertEqual(output.stdout.split(), ['False', 'True', 'False', 'True'])
+        
+    def test_31_dice_copy_weights(self):
+        """Test that dice built from the same weights array don't share it"""
+        faces = np.array(['A', 'B'])
+        weights = np.array([1.0, 1.0])
+        die20, die21 = Die(faces, weights=weights), Die(faces, weights=weights)
+        die20.change_weight('A', 0)
+        self.assertEqual(list(weights), [1.0, 1.0])
+        self.assertEqual(die21.show_die().loc['A', 'Weight'], 1.0)
+        self.assertIn('A', die21.roll_die(200, seed=0))
+        self.assertEqual(set(die20.roll_die(200, seed=0)), {'B'})
+        
+    def test_32_show_die_snapshot(self):
+        """Test that the die's data frame is a snapshot that edits don't reach"""
+        die22 = Die(np.array(['A', 'B']))
+        shown = die22.show_die()
+        shown.loc['A', 'Weight'] = 5.0
+        self.assertEqual(die22.show_die().loc['A', 'Weight'], 1.0)
+        die22.change_weight('A', 5)
+        self.assertEqual(die22.df.loc['A', 'Weight'], 5.0)
+        self.assertEqual(shown.loc['B', 'Weight'], 1.0)
+        
+    def test_33_blocked_roll_plan(self):
+        """Test that drawing a play's uniforms in row blocks gives the same rolls as one block"""
+        game25 = Game([Die(np.array(['A', 'B', 'C'])), Die(np.array([1, 2])), Die(np.array(['A', 'B', 'C']))])
+        plan = game25._plan()
+        whole = _roll_plan(game25.dice, plan, 1000, np.random.default_rng(3), block_rolls=1000)
+        for block_rolls in (1, 7, 999):
+            blocked = _roll_plan(game25.dice, plan, 1000, np.random.default_rng(3), block_rolls=block_rolls)
+            self.assertTrue(np.array_equal(whole, blocked))
+        
+    def test_34_face_counts_small_dtype(self):
+        """Test the per-roll face counts against a plain count of each roll, in a small integer dtype"""
+        faces = np.array(['A', 'B', 'C', 'D'])
+        game26 = Game([Die(faces) for _ in range(5)])
+        game26.play(300, seed=4)
+        counts = Analyzer(game26).face_counts_per_roll()
+        self.assertEqual(counts.dtypes.unique().tolist(), [np.dtype(np.int8)])
+        outcome = game26.show_outcome()
+        for roll in (0, 150, 299):
+            expected = Counter(outcome.loc[roll])
+            self.assertEqual({face: counts.loc[roll, face] for face in faces if counts.loc[roll, face]}, expected)
+        
+    def test_35_parallel_aggregate_zero_rolls(self):
+        """Test that an aggregate parallel play of no rolls gives empty results like play does"""
+        faces = np.array(['A', 'B', 'C'])
+        game27 = Game([Die(faces), Die(faces)])
+        game27.play_parallel(0, seed=1, workers=1, aggregate=True)
+        analyzer = Analyzer(game27)
+        self.assertEqual(analyzer.jackpot(), 0)
+        self.assertEqual(len(analyzer.permutation_count()), 0)
+        game27.play(0, aggregate=True)
+        self.assertTrue(analyzer.face_counts().equals(Analyzer(game27).face_counts()))
+        
+    def test_36_streaming_before_update(self):
+        """Test that a StreamingAnalyzer with no chunks folded in throws a clear error for its results"""
+        faces = np.array(['A', 'B', 'C'])
+        streaming = StreamingAnalyzer(Game([Die(faces), Die(faces)]))
+        self.assertEqual(streaming.jackpot(), 0)
+        for result in (streaming.face_counts, streaming.combo_count, streaming.permutation_count):
+            with self.assertRaisesRegex(ValueError, 'No chunks analysed yet'):
+                result()
+        
+    def test_37_save_load_mixed_faces(self):
+        """Test saving and loading a game whose dice mix number and letter faces, without pickling"""
+        game28 = Game([Die(np.array([1, 2, 3])), Die(np.array(['A', 'B']))])
+        game28.play(50, seed=2)
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'run')
+            game28.save(path)
+            self.assertFalse(os.path.exists(os.path.join(path, 'faces.npy')))
+            game29 = Game.load(path, mmap=False)
+            self.assertEqual(game29._faces.tolist(), game28._faces.tolist())
+            self.assertTrue(game29.show_outcome().equals(game28.show_outcome()))
+            
+            #faces JSON can't hold are refused before anything is written
+            game31 = Game([Die(np.array([b'a', b'b']))])
+            game31.play(10)
+            unsaved = os.path.join(tmp, 'bytes')
+            with self.assertRaises(ValueError):
+                game31.save(unsaved)
+            self.assertFalse(os.path.exists(unsaved))
+        
+    def test_38_sparse_column_fallback(self):
+        """Test that sparse face counts come out the same when pandas' sparse index class can't be imported"""
+        faces = np.array(['A', 'B', 'C', 'D'])
+        game30 = Game([Die(faces), Die(faces), Die(faces)])
+        game30.play(100, seed=9)
+        direct = Analyzer(game30).face_counts_per_roll(sparse=True)
+        import pandas._libs.sparse
+        saved = sys.modules['pandas._libs.sparse']
+        sys.modules['pandas._libs.sparse'] = None
+        try:
+            fallback = Analyzer(game30).face_counts_per_roll(sparse=True)
+        finally:
+            sys.modules['pandas._libs.sparse'] = saved
+        self.assertTrue(direct.equals(fallback))
+        self.assertEqual(list(fallback.dtypes.unique()), list(direct.dtypes.unique()))
+        
 if __name__ == '__main__':
     unittest.main(argv=[''], verbosity=2, exit=False)
\ No newline at end of file
@@ -0,0 +1,61 @@
+import unittest
+import warnings
+import numpy as np
+import pandas as pd
+from montecarlo.simulator import Die
+from montecarlo.simulator import Game
+from montecarlo.analytic import ExactAnalyzer
+
+class TestExactAnalyzer(unittest.TestCase):
+    """Unit tests for the ExactAnalyzer class"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        # Two fair six sided dice
+        faces = np.array(['A', 'B', 'C', 'D', 'E', 'F'])
+        self.game = Game([Die(faces), Die(faces)])
+        self.exact = ExactAnalyzer(self.game)
+        
+    def test_init_invalid(self):
+        """Test exact analyzer initialization with invalid input"""
+        with self.assertRaises(ValueError):
+            ExactAnalyzer("not a game object")
+            
+    def test_jackpot(self):
+        """Test the jackpot probability of two fair dice"""
+        self.assertAlmostEqual(self.exact.jackpot(), 1 / 6)
+        self.assertAlmostEqual(self.exact.jackpot_faces()['A'], 1 / 36)
+        
+    def test_face_counts_per_roll(self):
+        """Test the distribution of face counts in a roll"""
+        dist = self.exact.face_counts_per_roll()
+        self.assertEqual(list(dist.index), [0, 1, 2])
+        self.assertTrue(np.allclose(dist['A'], [25 / 36, 10 / 36, 1 / 36]))
+        
+    def test_combo_count(self):
+        """Test combination probabilities of two fair dice"""
+        combos = self.exact.combo_count()
+        self.assertIsInstance(combos.index, pd.MultiIndex)
+        self.assertEqual(len(combos), 21)
+        self.assertAlmostEqual(combos.loc[('A', 'A'), 'Probability'], 1 / 36)
+        self.assertAlmostEqual(combos.loc[('A', 'B'), 'Probability'], 2 / 36)
+        
+    def test_permutation_count(self):
+        """Test permutation probabilities with a loaded die"""
+        loaded = Die(np.array(['A', 'B']))
+        loaded.change_weight('A', 3)
+        perms = ExactAnalyzer(Game([loaded, Die(np.array(['A', 'B']))])).permutation_count()
+        self.assertEqual(len(perms), 4)
+        self.assertAlmostEqual(perms.loc[('A', 'B'), 'Probability'], 0.75 * 0.5)
+        
+    def test_fallback_simulation(self):
+        """Test that outcome spaces past max_states are estimated by simulation"""
+        exact = ExactAnalyzer(self.game, max_states=10, fallback_rolls=2000, seed=1)
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            perms = exact.permutation_count()
+        self.assertEqual(len(caught), 1)
+        self.assertAlmostEqual(perms['Probability'].sum(), 1.0)
+
+if __name__ == '__main__':
+    unittest.main(argv=[''], verbosity=2, exit=False)
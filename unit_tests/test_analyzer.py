@@ -4,6 +4,7 @@ import pandas as pd
 from simulator.dice import Die
 from simulator.game import Game
 from simulator.analyzer import Analyzer
+import montecarlo.simulator
 
 class TestAnalyzer(unittest.TestCase):
     """Unit tests for the Analyzer class"""
@@ -73,5 +74,11 @@ class TestAnalyzer(unittest.TestCase):
         # (since order matters in permutations)
         self.assertTrue(len(perms) >= len(self.analyzer.combo_count()))
 
+    def test_shared_classes(self):
+        """Test that the simulator and montecarlo classes are the same, so objects move between them"""
+        self.assertIs(Game, montecarlo.simulator.Game)
+        self.assertIs(Analyzer, montecarlo.simulator.Analyzer)
+        self.assertEqual(montecarlo.simulator.Analyzer(self.game).jackpot(), self.analyzer.jackpot())
+
 if __name__ == '__main__':
     unittest.main(argv=[''], verbosity=2, exit=False)
\ No newline at end of file
@@ -0,0 +1,74 @@
+import unittest
+import numpy as np
+from montecarlo.simulator import Die, Game, Analyzer
+from montecarlo.batch import BatchAnalyzer
+
+class TestBatchAnalyzer(unittest.TestCase):
+    """Unit tests for the BatchAnalyzer class"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        faces = np.array(['A', 'B', 'C'])
+        loaded = Die(faces)
+        loaded.change_weight('A', 5)
+        self.fair = Game([Die(faces), Die(faces), Die(faces)])
+        self.fair.play(1000, seed=1)
+        self.loaded = Game([loaded, Die(np.array(['C', 'D'])), loaded])
+        self.loaded.play(400, seed=2)
+        self.batch = BatchAnalyzer({'fair': self.fair, 'loaded': self.loaded})
+        
+    def test_init(self):
+        """Test that non-Game inputs and games with different numbers of dice are refused"""
+        with self.assertRaises(ValueError):
+            BatchAnalyzer(['not a game'])
+        two_dice = Game([Die(np.array([1, 2])), Die(np.array([1, 2]))])
+        two_dice.play(10)
+        with self.assertRaises(ValueError):
+            BatchAnalyzer([self.fair, two_dice])
+        
+    def test_jackpot(self):
+        """Test the jackpots of each game"""
+        jackpots = self.batch.jackpot()
+        self.assertEqual(list(jackpots.index), ['fair', 'loaded'])
+        self.assertEqual(jackpots['fair'], Analyzer(self.fair).jackpot())
+        self.assertEqual(jackpots['loaded'], Analyzer(self.loaded).jackpot())
+        
+    def test_face_counts(self):
+        """Test the face totals and per-roll face counts over the shared faces"""
+        totals = self.batch.face_counts()
+        self.assertEqual(list(totals.columns), ['A', 'B', 'C', 'D'])
+        self.assertEqual(totals.loc['fair'].sum(), 3000)
+        self.assertEqual(totals.loc['fair', 'D'], 0)
+        per_roll = self.batch.face_counts_per_roll().loc['loaded']
+        expected = Analyzer(self.loaded).face_counts_per_roll()
+        self.assertTrue((per_roll[expected.columns].values == expected.values).all())
+        
+    def test_counts(self):
+        """Test that the combinations and permutations of each game match a single game Analyzer"""
+        for name, game in self.batch.games.items():
+            combos = self.batch.combo_count().loc[name]
+            self.assertTrue(combos.equals(Analyzer(game).combo_count()))
+            perms = self.batch.permutation_count().loc[name]
+            self.assertTrue(perms.equals(Analyzer(game).permutation_count()))
+        
+    def test_from_codes(self):
+        """Test analyzing outcomes stacked in a 3-D code array"""
+        codes = np.array([[[0, 0], [0, 1]], [[1, 1], [1, 1]]])
+        batch = BatchAnalyzer.from_codes(codes, np.array(['H', 'T']), names=['x', 'y'])
+        self.assertEqual(list(batch.jackpot()), [1, 2])
+        self.assertEqual(batch.permutation_count().loc[('y', 'T', 'T'), 'Count'], 2)
+        
+    def test_from_codes_invalid(self):
+        """Test that codes outside the faces and clashing names are refused"""
+        faces = np.array(['H', 'T'])
+        with self.assertRaises(ValueError):
+            BatchAnalyzer.from_codes(np.array([[[0, 2]]]), faces)
+        with self.assertRaises(ValueError):
+            BatchAnalyzer.from_codes(np.array([[[0, -1]]]), faces)
+        with self.assertRaises(ValueError):
+            BatchAnalyzer.from_codes(np.zeros((2, 1, 2), dtype=int), faces, names=['x', 'x'])
+        with self.assertRaises(ValueError):
+            BatchAnalyzer.from_codes(np.zeros((2, 1, 2), dtype=int), faces, names=['x'])
+
+if __name__ == '__main__':
+    unittest.main(argv=[''], verbosity=2, exit=False)
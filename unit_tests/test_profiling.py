@@ -0,0 +1,58 @@
+import unittest
+import numpy as np
+import pandas as pd
+from montecarlo.simulator import Die
+from montecarlo.simulator import Game
+from montecarlo.simulator import Analyzer
+from montecarlo.sketch import OutcomeSketch
+from montecarlo.profiling import profile
+
+class TestProfiling(unittest.TestCase):
+    """Unit tests for the profiling Stats class"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        faces = np.array(['A', 'B', 'C', 'D', 'E', 'F'])
+        self.game = Game([Die(faces), Die(faces)])
+        
+    def test_collects_stages(self):
+        """Test that calls, rows and bytes are recorded per stage"""
+        with profile() as stats:
+            self.game.play(1000)
+            analyzer = Analyzer(self.game)
+            analyzer.jackpot()
+            analyzer.jackpot()
+            self.game.show_outcome("narrow")
+        table = stats.table()
+        self.assertIsInstance(table, pd.DataFrame)
+        self.assertEqual(table.loc['Game.play', 'calls'], 1)
+        self.assertEqual(table.loc['Game.play', 'rows'], 1000)
+        self.assertEqual(table.loc['Analyzer.jackpot', 'calls'], 2)
+        self.assertEqual(table.loc['DataFrame narrow', 'rows'], 2000)
+        self.assertGreater(table.loc['sampling', 'bytes'], 0)
+        
+    def test_counts_frames_built_outside_simulator(self):
+        """Test that count frames built by the sketch are timed like the Analyzer's"""
+        self.game.play(1000)
+        codes, faces = self.game._encoded()
+        sketch = OutcomeSketch(top=5)
+        sketch.update(codes, faces)
+        with profile(memory=False) as stats:
+            sketch.count_frame()
+        self.assertEqual(stats.table().loc['DataFrame counts', 'calls'], 1)
+        
+    def test_disabled_restores_methods(self):
+        """Test that nothing stays wrapped once collection stops"""
+        play = Game.__dict__['play']
+        with profile(memory=False):
+            self.assertIsNot(Game.__dict__['play'], play)
+        self.assertIs(Game.__dict__['play'], play)
+        
+    def test_one_collector_at_a_time(self):
+        """Test that a second Stats object can't collect at the same time"""
+        with profile(memory=False):
+            with self.assertRaises(RuntimeError):
+                profile().enable()
+
+if __name__ == '__main__':
+    unittest.main(argv=[''], verbosity=2, exit=False)
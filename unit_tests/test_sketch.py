@@ -0,0 +1,94 @@
+import unittest
+import numpy as np
+from montecarlo.simulator import Die, Game, Analyzer, StreamingAnalyzer
+from montecarlo.sketch import CountMinSketch, HyperLogLog, OutcomeSketch
+
+class TestSketches(unittest.TestCase):
+    """Unit tests for the CountMinSketch and HyperLogLog classes"""
+    
+    def test_count_min(self):
+        """Test that estimates never undercount and stay within the error bound"""
+        keys = np.arange(5000, dtype=np.uint64)
+        counts = np.random.default_rng(0).integers(1, 50, keys.size)
+        sketch = CountMinSketch(width=2**12, depth=4)
+        sketch.add(keys, counts)
+        estimates = sketch.query(keys)
+        self.assertTrue((estimates >= counts).all())
+        self.assertGreater(np.mean(estimates - counts <= sketch.error()), 0.95)
+        
+    def test_hyperloglog(self):
+        """Test the distinct count estimate, including keys added more than once"""
+        sketch = HyperLogLog(precision=12)
+        keys = np.arange(100000, dtype=np.uint64)
+        sketch.add(keys)
+        sketch.add(keys[:50000])
+        self.assertAlmostEqual(sketch.estimate() / 100000, 1, delta=0.05)
+        with self.assertRaises(ValueError):
+            HyperLogLog(precision=30)
+
+class TestOutcomeSketch(unittest.TestCase):
+    """Unit tests for approximate combination and permutation counts"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        letters = Die(np.array(list('ABCDEFGHIJKL')))
+        letters.change_weights(['E', 'L'], [12, 8])
+        self.game = Game([letters] * 4)
+        self.game.play(50000, seed=4)
+        self.analyzer = Analyzer(self.game)
+        
+    def test_top_permutations(self):
+        """Test that the most frequent permutations and their counts are found"""
+        exact = self.analyzer.permutation_count()['Count'].sort_values(ascending=False)
+        approx = self.analyzer.permutation_count(approximate={'top': 5})
+        self.assertEqual(len(approx), 5)
+        self.assertEqual(approx.index[0], exact.index[0])
+        self.assertTrue((approx['Count'].values >= exact.loc[approx.index].values).all())
+        self.assertLessEqual((approx['Count'].values - exact.loc[approx.index].values).max(), approx.attrs['error'])
+        self.assertAlmostEqual(approx.attrs['distinct'] / len(exact), 1, delta=0.05)
+        
+    def test_combo_estimates(self):
+        """Test per-combination estimates, in any order of faces"""
+        sketch = self.analyzer.combo_sketch(top=10)
+        exact = self.analyzer.combo_count()
+        estimates = sketch.count([('E', 'L', 'E', 'L'), ('A', 'B', 'C', 'D')])
+        self.assertGreaterEqual(estimates.iloc[0], exact.loc[('E', 'E', 'L', 'L'), 'Count'])
+        self.assertGreaterEqual(estimates.iloc[1], exact.loc[('A', 'B', 'C', 'D'), 'Count'])
+        with self.assertRaises(ValueError):
+            sketch.count([('E', 'L', 'E', 'Z')])
+        
+    def test_empty(self):
+        """Test that an empty sketch throws a clear error for its counts"""
+        sketch = OutcomeSketch(top=5)
+        with self.assertRaisesRegex(ValueError, 'No outcomes added yet'):
+            sketch.count([('A', 'B')])
+        with self.assertRaisesRegex(ValueError, 'No outcomes added yet'):
+            sketch.count_frame()
+        
+        #a game of no rolls gives an empty frame, as the exact counts do
+        self.game.play(0)
+        self.assertEqual(len(Analyzer(self.game).combo_count(approximate=True)), 0)
+        
+    def test_chunked_heavy_hitters(self):
+        """Test that heavy hitters keep their counts exactly across chunks, even in a narrow sketch"""
+        counts = self.analyzer.permutation_count()['Count']
+        streaming = StreamingAnalyzer(self.game, approximate={'top': 5, 'width': 2**8})
+        streaming.run(50000, chunk_size=5000, seed=4)
+        approx = streaming.permutation_count()
+        exact = counts.loc[approx.index]
+        self.assertTrue((approx['Count'].values >= exact.values).all())
+        self.assertLessEqual((approx['Count'].values - exact.values).max(), approx.attrs['error'])
+        self.assertLess(approx.attrs['error'], streaming.permutation_sketch().counts.error())
+        self.assertEqual(set(approx.index), set(counts.nlargest(5).index))
+        
+    def test_streaming(self):
+        """Test that a streaming analyzer can count with sketches of fixed size"""
+        streaming = StreamingAnalyzer(self.game, approximate={'top': 3}).run(20000, chunk_size=5000, seed=4)
+        self.assertEqual(len(streaming.combo_count()), 3)
+        self.assertIsInstance(streaming.permutation_sketch(), OutcomeSketch)
+        self.game.play(20000, seed=4)
+        top = Analyzer(self.game).combo_count()['Count'].idxmax()
+        self.assertEqual(streaming.combo_count().index[0], top)
+
+if __name__ == '__main__':
+    unittest.main(argv=[''], verbosity=2, exit=False)
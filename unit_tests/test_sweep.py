@@ -0,0 +1,91 @@
+import os
+import json
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from montecarlo.simulator import Die
+from montecarlo.sweep import Sweep
+
+class TestSweep(unittest.TestCase):
+    """Unit tests for the Sweep class"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        faces = np.array(['A', 'B', 'C'])
+        loaded = Die(faces)
+        loaded.change_weight('A', 5)
+        self.dice = {'fair': Die(faces), 'loaded': loaded}
+        
+    def test_configs(self):
+        """Test that the grid has one configuration per combination of settings"""
+        sweep = Sweep(self.dice, [2, 3], [100, 200, 300])
+        self.assertEqual(len(sweep.configs()), 12)
+        
+    def test_run(self):
+        """Test the tidy result table"""
+        results = Sweep(self.dice, [2, 3], [100], seed=1).run(workers=1)
+        self.assertIsInstance(results, pd.DataFrame)
+        self.assertEqual(len(results), 4)
+        self.assertEqual(list(results['dice']), ['fair', 'fair', 'loaded', 'loaded'])
+        self.assertTrue((results['jackpots'] <= 100).all())
+        self.assertTrue((results['distinct_combos'] <= results['distinct_permutations']).all())
+        
+    def test_workers_match(self):
+        """Test that the results don't depend on the number of workers"""
+        serial = Sweep(self.dice, [2], [500], seed=3).run(workers=1)
+        pooled = Sweep(self.dice, [2], [500], seed=3).run(workers=2)
+        self.assertTrue(serial.drop(columns='seconds').equals(pooled.drop(columns='seconds')))
+        
+    def test_checkpoint_resume(self):
+        """Test that a resumed sweep only runs the missing configurations"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'sweep.jsonl')
+            full = Sweep(self.dice, [2, 3], [100], seed=2, checkpoint=path).run(workers=1)
+            
+            #keep the header and two finished rows, and cut the third short as if interrupted
+            with open(path) as f:
+                lines = f.readlines()
+            with open(path, 'w') as f:
+                f.writelines(lines[:3])
+                f.write(lines[3][:10])
+            resumed = Sweep(self.dice, [2, 3], [100], seed=2, checkpoint=path).run(workers=1)
+            self.assertTrue(full.drop(columns='seconds').equals(resumed.drop(columns='seconds')))
+            self.assertTrue(full['seconds'].iloc[:2].equals(resumed['seconds'].iloc[:2]))
+            
+            #the cut short line is gone and every configuration is in the file exactly once
+            with open(path) as f:
+                keys = [tuple(json.loads(line)[name] for name in ('dice', 'num_dice', 'num_rolls'))
+                        for line in f.readlines()[1:]]
+            self.assertEqual(sorted(keys), sorted(map(tuple, full[['dice', 'num_dice', 'num_rolls']].values.tolist())))
+            self.assertEqual(len(keys), len(set(keys)))
+            reloaded = Sweep(self.dice, [2, 3], [100], seed=2, checkpoint=path).run(workers=1)
+            self.assertTrue(full.drop(columns='seconds').equals(reloaded.drop(columns='seconds')))
+
+    def test_checkpoint_mismatch(self):
+        """Test that a checkpoint isn't reused by a sweep with another seed or other weights"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'sweep.jsonl')
+            Sweep(self.dice, [2], [100], seed=2, checkpoint=path).run(workers=1)
+            with self.assertRaises(ValueError):
+                Sweep(self.dice, [2], [100], seed=99, checkpoint=path).run(workers=1)
+            self.dice['fair'].change_weight('B', 3)
+            with self.assertRaises(ValueError):
+                Sweep(self.dice, [2], [100], seed=2, checkpoint=path).run(workers=1)
+
+    def test_checkpoint_resume_unseeded(self):
+        """Test that a sweep without a seed resumes with the seed its checkpoint recorded"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'sweep.jsonl')
+            first = Sweep(self.dice, [2], [100], checkpoint=path).run(workers=1)
+            resumed = Sweep(self.dice, [2, 3], [100], checkpoint=path).run(workers=1)
+            self.assertEqual(len(resumed), 4)
+            self.assertTrue(first.equals(resumed[resumed['num_dice'] == 2].reset_index(drop=True)))
+            
+    def test_no_rolls(self):
+        """Test that a configuration without rolls is refused"""
+        with self.assertRaises(ValueError):
+            Sweep(self.dice, [2], [0, 100])
+
+if __name__ == '__main__':
+    unittest.main(argv=[''], verbosity=2, exit=False)
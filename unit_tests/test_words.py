@@ -0,0 +1,51 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from montecarlo.simulator import Die
+from montecarlo.simulator import Game
+from montecarlo.simulator import Analyzer
+from montecarlo.words import WordList
+
+class TestWordList(unittest.TestCase):
+    """Unit tests for the WordList class"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.words = WordList(['cat', 'ACT', 'TAC', 'AT', 'ABSTRACTIONIST', "CAN'T"])
+        self.faces = np.array(['A', 'C', 'T'])
+        
+    def test_init(self):
+        """Test that non-alphabetic words are skipped"""
+        self.assertEqual(len(self.words), 5)
+        
+    def test_isin(self):
+        """Test matching rows of face codes against the words"""
+        rows = np.array([[1, 0, 2], [0, 1, 2], [2, 2, 2]])
+        self.assertEqual(list(self.words.isin(rows, self.faces)), [True, True, False])
+        # No words of this length and faces that aren't letters never match
+        self.assertFalse(self.words.isin(np.array([[0, 1, 2, 0]]), self.faces).any())
+        self.assertFalse(self.words.isin(np.array([[0, 1]]), np.array([1, 2])).any())
+        
+    def test_save_and_load(self):
+        """Test that a saved word list loads back with the same words"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'words.npz')
+            self.words.save(path)
+            loaded = WordList.from_file(path)
+            self.assertEqual(len(loaded), 5)
+            self.assertIs(WordList.from_file(path), loaded)
+            
+    def test_analyzer_word_count(self):
+        """Test counting the words rolled by a game of letter dice"""
+        game = Game([Die(self.faces)] * 3)
+        game.play(300)
+        words = Analyzer(game).word_count(self.words)
+        self.assertIsInstance(words.index, pd.MultiIndex)
+        self.assertTrue(set(words.index) <= {('C', 'A', 'T'), ('A', 'C', 'T'), ('T', 'A', 'C')})
+        perms = Analyzer(game).permutation_count()
+        self.assertEqual(words['Count'].sum(), perms.loc[list(words.index), 'Count'].sum())
+
+if __name__ == '__main__':
+    unittest.main(argv=[''], verbosity=2, exit=False)